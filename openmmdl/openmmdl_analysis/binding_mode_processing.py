@@ -6,7 +6,11 @@ from MDAnalysis.analysis import rms, diffusionmap
 from MDAnalysis.analysis.distances import dist
 from tqdm import tqdm
 from pathlib import Path
-from numba import jit  
+
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
 
 
 def gather_interactions(df, ligand_rings, peptide=None):
@@ -640,35 +644,50 @@ def update_values(df, new, unique_data):
         values_to_update = new.loc[frame_value, list(unique_data.values())]
         df.loc[idx, list(unique_data.values())] = values_to_update
 
-@jit
-def calc_rmsd_2frames(ref, frame):
-    """
-    RMSD calculation between a reference and a frame.
+def calculate_distance_matrix(pdb_md, selection, use_gpu=False, block_size=256):
+    """Calculates the RMSD between every pair of frames of the trajectory.
+
+    Args:
+        pdb_md (mda universe): MDAnalysis universe containing the trajectory.
+        selection (str): Selection string of the atoms used for the RMSD.
+        use_gpu (bool, optional): Compute the matrix on the GPU with CuPy. Falls back to the CPU if CuPy is not installed. Defaults to False.
+        block_size (int, optional): Number of frames per block of the matrix product. Defaults to 256.
+
+    Returns:
+        numpy.ndarray: Symmetric matrix with the RMSD between all frames.
     """
-    dist = np.zeros(len(frame))
-    for atom in range(len(frame)):
-        dist[atom] = (
-            (ref[atom][0] - frame[atom][0]) ** 2
-            + (ref[atom][1] - frame[atom][1]) ** 2
-            + (ref[atom][2] - frame[atom][2]) ** 2
-        )
-
-    return np.sqrt(dist.mean())
-
-
-def calculate_distance_matrix(pdb_md, selection):
-    distances = np.zeros((len(pdb_md.trajectory), len(pdb_md.trajectory)))
-    # calculate distance matrix
-    for i in tqdm(range(len(pdb_md.trajectory))):
-        pdb_md.trajectory[i]
-        frame_i = pdb_md.select_atoms(selection).positions
-        # distances[i] = md.rmsd(traj_aligned, traj_aligned, frame=i)
-        for j in range(i + 1, len(pdb_md.trajectory)):
-            pdb_md.trajectory[j]
-            frame_j = pdb_md.select_atoms(selection).positions
-            rmsd = calc_rmsd_2frames(frame_i, frame_j)
-            distances[i][j] = rmsd
-            distances[j][i] = rmsd
+    n_frames = len(pdb_md.trajectory)
+    # read the selected positions of every frame once instead of seeking the trajectory for each pair
+    atomgroup = pdb_md.select_atoms(selection)
+    coords = np.empty((n_frames, atomgroup.n_atoms, 3), dtype=np.float32)
+    for i, ts in enumerate(pdb_md.trajectory):
+        coords[i] = atomgroup.positions
+    # fall back to numpy if cupy is not available
+    if use_gpu and cp is None:
+        print("CuPy is not installed, calculating the distance matrix on the CPU")
+    xp = cp if use_gpu and cp is not None else np
+    # calculate distance matrix from the Gram matrix, ||x - y||^2 = ||x||^2 + ||y||^2 - 2 x.y
+    # positions are taken relative to the mean structure and the products are accumulated in float64,
+    # in float32 the cancellation of the three terms leaves errors of ~1e-3 A between identical frames
+    flat = coords.reshape(n_frames, -1).astype(np.float64)
+    flat -= flat.mean(axis=0)
+    flat = xp.asarray(flat)
+    sq = xp.einsum("ij,ij->i", flat, flat)
+    distances = xp.empty((n_frames, n_frames), dtype=xp.float64)
+    # fill the symmetric matrix block by block so the operands of each product stay in cache
+    for i0 in range(0, n_frames, block_size):
+        i1 = min(i0 + block_size, n_frames)
+        for j0 in range(i0, n_frames, block_size):
+            j1 = min(j0 + block_size, n_frames)
+            block = sq[i0:i1, None] + sq[None, j0:j1] - 2.0 * (flat[i0:i1] @ flat[j0:j1].T)
+            distances[i0:i1, j0:j1] = block
+            distances[j0:j1, i0:i1] = block.T
+    distances /= atomgroup.n_atoms
+    xp.maximum(distances, 0.0, out=distances)
+    xp.sqrt(distances, out=distances)
+    xp.fill_diagonal(distances, 0.0)
+    if xp is not np:
+        distances = cp.asnumpy(distances)
     return distances
 
 
@@ -684,23 +703,13 @@ def calculate_representative_frame(bmode_frames, DM):
         int: Number of the most representative frame.
     """
     frames = bmode_frames
-    mean_rmsd_per_frame = {}
-    # first loop  : first frame
-    for frame_i in frames:
-        mean_rmsd_per_frame[frame_i] = 0
-        # we will add the rmsd between theses 2 frames and then calcul the
-        # mean
-        for frame_j in frames:
-            # We don't want to calcul the same frame.
-            if not frame_j == frame_i:
-                # we add to the corresponding value in the list of all rmsd
-                # the RMSD betwween frame_i and frame_j
-                mean_rmsd_per_frame[frame_i] += DM[frame_i - 1, frame_j - 1]
-        # mean calculation
-        mean_rmsd_per_frame[frame_i] /= len(frames)
-
-        # Representative frame = frame with lower RMSD between all other
-        # frame of the cluster
-        repre = min(mean_rmsd_per_frame, key=mean_rmsd_per_frame.get)
+    # frames are numbered from 1, the rows of the distance matrix from 0
+    idx = np.asarray(frames) - 1
+    # the diagonal is zero, so the row sum is the summed RMSD to all other frames of the binding mode
+    mean_rmsd_per_frame = DM[np.ix_(idx, idx)].sum(axis=1) / len(frames)
+
+    # Representative frame = frame with lower RMSD between all other
+    # frame of the cluster
+    repre = frames[int(np.argmin(mean_rmsd_per_frame))]
 
     return repre
@@ -1,7 +1,10 @@
 import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
 from matplotlib.patches import Patch
 import os
+from functools import partial
+from multiprocessing import Pool
 
 
 def min_transition_calculation(min_transition):
@@ -23,37 +26,161 @@ def min_transition_calculation(min_transition):
     return min_transitions
 
 
-def binding_site_markov_network(
-    total_frames, min_transitions, combined_dict, fig_type, font_size=36, size_node=200
+def markov_chain_plot(
+    min_transition_percent,
+    pos,
+    transition_pairs,
+    self_loop_occurences,
+    edge_labels,
+    node_color_map,
+    node_size_map,
+    node_label_map,
+    fig_type,
+    font_size=36,
+    dpi=150,
 ):
-    """Generate Markov Chain plots based on transition probabilities.
+    """Generate and save the Markov Chain plot for a single transition treshold.
 
     Args:
-        total_frames (int): The number of frames in the protein-ligand MD simulation.
-        min_transitions (list):  list of transition tresholds in %. A Markov Chain plot will be generated for each of the tresholds.
-        combined_dict (dict): A dictionary with the information of the Binding Modes and their order of appearance during the simulation for all frames.
-        font_size (int, optional): The font size for the node labels. The default value is set to 12.
-        size_node (int, optional): The size of the nodes in the Markov Chain plot. the default value is set to 200.
+        min_transition_percent (float): Transition treshold in %. Transitions below the treshold are not shown.
+        pos (dict): Positions of the nodes in the plot.
+        transition_pairs (list): Tuples of two Binding Modes with a transition in at least one direction and the percentage of frames of the forward and backward transition.
+        self_loop_occurences (dict): Percentage of frames for each self-loop of a Binding Mode.
+        edge_labels (dict): Label with the forward and backward occurrences and probabilities of each edge.
+        node_color_map (dict): Color of each node.
+        node_size_map (dict): Size of each node.
+        node_label_map (dict): Label of each node.
+        fig_type (str): File type of the saved figure.
+        font_size (int, optional): The font size for the node labels. The default value is set to 36.
+        dpi (int, optional): The resolution of the saved Markov Chain plot. The default value is set to 150.
     """
-    font_size = 36 if font_size is None else font_size
-    size_node = 200 if size_node is None else size_node
-
-    # Calculate the number of elements in each part
-    total_length = len(combined_dict["all"])
-    part_length = total_length // 3
-    remaining_length = total_length % 3
-
-    # Divide the 'all_data' into three parts
-    part1_length = part_length + remaining_length
-    part2_length = part_length
-    part1_data = combined_dict["all"][:part1_length]
-    part2_data = combined_dict["all"][part1_length : part1_length + part2_length]
-    part3_data = combined_dict["all"][part1_length + part2_length :]
-
-    # Count the occurrences of each node in each part
-    part1_node_occurrences = {node: part1_data.count(node) for node in set(part1_data)}
-    part2_node_occurrences = {node: part2_data.count(node) for node in set(part2_data)}
-    part3_node_occurrences = {node: part3_data.count(node) for node in set(part3_data)}
+    # Create a directed graph
+    G = nx.DiGraph()
+
+    # Add both directions of every pair with a transition above the treshold to the graph
+    for state_a, state_b, forward_percent, backward_percent in transition_pairs:
+        if max(forward_percent, backward_percent) >= min_transition_percent:
+            G.add_edge(state_a, state_b, weight=forward_percent)
+            G.add_edge(state_b, state_a, weight=backward_percent)
+
+    # Add self-loops to the graph with their probabilities
+    for state, probability in self_loop_occurences.items():
+        if probability >= min_transition_percent:
+            G.add_edge(state, state, weight=probability)
+
+    # Generate the Markov Chain plot
+    fig = Figure(figsize=(60, 60))  # Increased figure size
+    ax = fig.subplots()
+    ax.set_title(
+        f"Markov Chain Plot {min_transition_percent}% Frames Transition",
+        fontsize=72,
+    )
+
+    # Sort the edges into self-loops, significant and non-significant transitions
+    self_loop_edges = []
+    significant_edges = []
+    significant_labels = {}
+    weak_edges = []
+    weak_labels = {}
+
+    for u, v, data in G.edges(data=True):
+        if u == v:  # Check if it is a self-loop
+            self_loop_edges.append((u, v))
+            continue
+
+        if data["weight"] >= min_transition_percent:
+            significant_edges.append((u, v))
+            significant_labels[(u, v)] = edge_labels[(u, v)]
+        else:
+            weak_edges.append((u, v))
+            weak_labels[(u, v)] = edge_labels[(u, v)]
+
+    # Draw each group of edges with a single call
+    connection_style = "arc3,rad=-0.1"
+    nx.draw_networkx_edges(
+        G,
+        pos,
+        edgelist=self_loop_edges,
+        width=0.1,  # Make self-loop arrows smaller
+        alpha=0.2,
+        edge_color="green",  # Set green color for self-loop arrows
+        connectionstyle=connection_style,
+        ax=ax,
+    )
+    nx.draw_networkx_edges(
+        G,
+        pos,
+        edgelist=significant_edges,
+        width=4.0,
+        alpha=0.7,
+        edge_color="black",  # Highlight significant transitions in black
+        connectionstyle=connection_style,
+        ax=ax,
+    )
+    nx.draw_networkx_edges(
+        G,
+        pos,
+        edgelist=weak_edges,
+        width=0.5,
+        alpha=0.7,
+        edge_color="grey",  # Use grey for non-significant transitions
+        connectionstyle=connection_style,
+        ax=ax,
+    )
+
+    nx.draw_networkx_edge_labels(
+        G, pos, edge_labels=significant_labels, font_size=26, ax=ax
+    )
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=weak_labels, font_size=36, ax=ax)
+
+    # Draw nodes with sizes correlated to occurrences and color top 10 nodes
+    nodes_list = list(G.nodes())
+    node_colors = [node_color_map[node] for node in nodes_list]
+    node_size = np.fromiter(
+        (node_size_map[node] for node in nodes_list),
+        dtype=float,
+        count=len(nodes_list),
+    )
+    nx.draw_networkx_nodes(
+        G,
+        pos,
+        nodelist=nodes_list,
+        node_size=node_size,
+        node_color=node_colors,
+        alpha=0.8,
+        ax=ax,
+    )
+
+    # Draw node labels with occurrence percentage and self-loop probability for nodes with edges
+    node_labels = {}
+
+    # Collect the edges of every node in a single pass over the graph
+    edges_by_node = {node: [] for node in nodes_list}
+    for u, v, data in G.edges(data=True):
+        edges_by_node[u].append((u, v, data["weight"]))
+        if u != v:
+            edges_by_node[v].append((u, v, data["weight"]))
+    node_degrees = dict(G.degree())
+
+    for node in nodes_list:
+        if node_degrees[node] > 0:  # Check if the node has at least one edge
+            edges_with_node = edges_by_node[node]
+            relevant_edges = [
+                edge for edge in edges_with_node if edge[2] >= min_transition_percent
+            ]
+
+            if relevant_edges:
+                node_labels[node] = node_label_map[node]
+
+    nx.draw_networkx_labels(
+        G,
+        pos,
+        labels=node_labels,
+        font_size=font_size,
+        font_color="black",
+        verticalalignment="center",
+        ax=ax,
+    )
 
     # Create the legend
     legend_labels = {
@@ -71,258 +198,174 @@ def binding_site_markov_network(
         for color, label in zip(legend_colors, legend_labels.values())
     ]
 
-    # Get the top 10 nodes with the most occurrences
-    node_occurrences = {
-        node: combined_dict["all"].count(node) for node in set(combined_dict["all"])
-    }
-    top_10_nodes = sorted(node_occurrences, key=node_occurrences.get, reverse=True)[:10]
+    # Add the legend to the plot
+    ax.legend(handles=legend_handles, loc="upper right", fontsize=48)
 
-    for min_transition_percent in min_transitions:
-        min_prob = min_transition_percent / 100  # Convert percentage to probability
+    ax.axis("off")
+    fig.tight_layout()
 
-        # Create a directed graph
-        G = nx.DiGraph()
+    # Save the plot
+    plot_filename = f"markov_chain_plot_{min_transition_percent}.{fig_type}"
+    plot_path = os.path.join("Binding_Modes_Markov_States", plot_filename)
+    fig.savefig(plot_path, dpi=dpi)
 
-        # Count the occurrences of each transition and self-loop
-        transitions = {}
-        self_loops = {}
-        for i in range(len(combined_dict["all"]) - 1):
-            current_state = combined_dict["all"][i]
-            next_state = combined_dict["all"][i + 1]
 
-            if current_state == next_state:  # Check for self-loop
-                self_loop = (current_state, next_state)
-                self_loops[self_loop] = self_loops.get(self_loop, 0) + 1
-            else:
-                transition = (current_state, next_state)
-                transitions[transition] = transitions.get(transition, 0) + 1
-
-        # Add edges to the graph with their probabilities
-        for transition, count in transitions.items():
-            current_state, next_state = transition
-            probability = (
-                count / len(combined_dict["all"]) * 100
-            )  # Convert probability to percentage
-            if probability >= min_transition_percent:
-                G.add_edge(current_state, next_state, weight=probability)
-                # Include the reverse transition with a different color
-                reverse_transition = (next_state, current_state)
-                reverse_count = transitions.get(
-                    reverse_transition, 0
-                )  # Use the correct count for the reverse transition
-                reverse_probability = reverse_count / len(combined_dict["all"]) * 100
-                G.add_edge(
-                    next_state, current_state, weight=reverse_probability, reverse=True
-                )
-
-        # Add self-loops to the graph with their probabilities
-        for self_loop, count in self_loops.items():
-            state = self_loop[0]
-            probability = (
-                count / len(combined_dict["all"]) * 100
-            )  # Convert probability to percentage
-            if probability >= min_transition_percent:
-                G.add_edge(state, state, weight=probability)
-
-        # Calculate transition probabilities for each direction (excluding self-loops)
-        transition_probabilities_forward = {}
-        transition_probabilities_backward = {}
-        transition_occurrences_forward = {}
-        transition_occurrences_backward = {}
-
-        for transition, count in transitions.items():
-            start_state, end_state = transition
-            forward_transition = (start_state, end_state)
-            backward_transition = (end_state, start_state)
-
-            # Separate counts for forward and backward transitions
-            forward_count = transitions.get(forward_transition, 0)
-            backward_count = transitions.get(backward_transition, 0)
-
-            transition_probabilities_forward[forward_transition] = (
-                forward_count / node_occurrences[start_state] * 100
-            )
-
-            transition_occurrences_forward[forward_transition] = (
-                forward_count / len(combined_dict["all"]) * 100
-            )
+def binding_site_markov_network(
+    total_frames,
+    min_transitions,
+    combined_dict,
+    fig_type,
+    font_size=36,
+    size_node=200,
+    dpi=150,
+    num_processes=1,
+):
+    """Generate Markov Chain plots based on transition probabilities.
 
-            transition_probabilities_backward[backward_transition] = (
-                backward_count / node_occurrences[end_state] * 100
-            )
+    Args:
+        total_frames (int): The number of frames in the protein-ligand MD simulation.
+        min_transitions (list):  list of transition tresholds in %. A Markov Chain plot will be generated for each of the tresholds.
+        combined_dict (dict): A dictionary with the information of the Binding Modes and their order of appearance during the simulation for all frames.
+        font_size (int, optional): The font size for the node labels. The default value is set to 12.
+        size_node (int, optional): The size of the nodes in the Markov Chain plot. the default value is set to 200.
+        dpi (int, optional): The resolution of the saved Markov Chain plots. The default value is set to 150.
+        num_processes (int, optional): The maximum number of CPUs used to draw the plots of the different tresholds. The default value is set to 1.
+    """
+    font_size = 36 if font_size is None else font_size
+    size_node = 200 if size_node is None else size_node
 
-            transition_occurrences_backward[backward_transition] = (
-                backward_count / len(combined_dict["all"]) * 100
-            )
+    sequence = combined_dict["all"]
 
-        # Calculate self-loop probabilities
-        self_loop_probabilities = {}
-        self_loop_occurences = {}
-        for self_loop, count in self_loops.items():
-            state = self_loop[0]
-            self_loop_probabilities[state] = count / node_occurrences[state]
-            self_loop_occurences[state] = count / len(combined_dict["all"]) * 100
-
-        # Generate the Markov Chain plot
-        plt.figure(figsize=(60, 60))  # Increased figure size
-        plt.title(
-            f"Markov Chain Plot {min_transition_percent}% Frames Transition",
-            fontsize=72,
-        )
+    # Calculate the number of elements in each part
+    total_length = len(sequence)
+    # Without any frames there are no binding modes or transitions to plot
+    if total_length == 0:
+        return
+    percentage_scale = 100.0 / total_length
+    part_length = total_length // 3
+    remaining_length = total_length % 3
 
-        # Draw nodes and edges
-        pos = nx.spring_layout(
-            G, k=2, seed=42
-        )  # Increased distance between nodes (k=2)
-        edge_colors = []
-
-        for u, v, data in G.edges(data=True):
-            weight = data["weight"]
-
-            if u == v:  # Check if it is a self-loop
-                edge_colors.append("green")  # Set green color for self-loop arrows
-                width = 0.1  # Make self-loop arrows smaller
-                connection_style = (
-                    "arc3,rad=-0.1"  # Make the self-loops more curved and compact
-                )
-                nx.draw_networkx_edges(
-                    G,
-                    pos,
-                    edgelist=[(u, v)],
-                    width=width,
-                    alpha=0.2,
-                    edge_color=edge_colors[-1],
-                    connectionstyle=connection_style,
-                )
-            elif weight >= min_transition_percent:
-                edge_colors.append("black")  # Highlight significant transitions in red
-
-                # Check if both nodes are present before adding labels
-                if G.has_node(u) and G.has_node(v):
-                    width = 4.0
-                    forward_label = f"{transition_occurrences_forward.get((v, u), 0):.2f}% of Frames →, {transition_probabilities_forward.get((v, u), 0):.2f}% probability"
-                    backward_label = f"{transition_occurrences_backward.get((u, v), 0):.2f}% of Frames ←, {transition_probabilities_backward.get((u, v), 0):.2f}% probability"
-                    edge_label = f"{forward_label}\n{backward_label}"
-
-                    connection_style = "arc3,rad=-0.1"
-                    nx.draw_networkx_edges(
-                        G,
-                        pos,
-                        edgelist=[(u, v)],
-                        width=width,
-                        alpha=0.7,
-                        edge_color=edge_colors[-1],
-                        connectionstyle=connection_style,
-                    )
-                    nx.draw_networkx_edge_labels(
-                        G, pos, edge_labels={(u, v): edge_label}, font_size=26
-                    )
-            else:
-                edge_colors.append("grey")  # Use black for non-significant transitions
-                width = 0.5
-
-                # Check if both nodes are present before adding labels
-                if G.has_node(u) and G.has_node(v):
-                    forward_label = f"{transition_occurrences_forward.get((v, u), 0):.2f}% of Frames →, {transition_probabilities_forward.get((v, u), 0):.2f}% probability"
-                    backward_label = f"{transition_occurrences_backward.get((u, v), 0):.2f}% of Frames ←, {transition_probabilities_backward.get((u, v), 0):.2f}% probability"
-                    edge_label = f"{forward_label}\n{backward_label}"
-
-                    connection_style = "arc3,rad=-0.1"
-                    nx.draw_networkx_edges(
-                        G,
-                        pos,
-                        edgelist=[(u, v)],
-                        width=width,
-                        alpha=0.7,
-                        edge_color=edge_colors[-1],
-                        connectionstyle=connection_style,
-                    )
-                    nx.draw_networkx_edge_labels(
-                        G, pos, edge_labels={(u, v): edge_label}, font_size=36
-                    )
-
-        # Update the node colors based on their appearance percentages in each part
-        node_colors = []
-        for node in G.nodes():
-            if node in top_10_nodes:
-                part1_percentage = (
-                    part1_node_occurrences.get(node, 0) / node_occurrences[node]
-                )
-                part2_percentage = (
-                    part2_node_occurrences.get(node, 0) / node_occurrences[node]
-                )
-                part3_percentage = (
-                    part3_node_occurrences.get(node, 0) / node_occurrences[node]
-                )
-
-                if part1_percentage > 0.5:
-                    node_colors.append("green")
-                elif part2_percentage > 0.5:
-                    node_colors.append("orange")
-                elif part3_percentage > 0.5:
-                    node_colors.append("red")
-                else:
-                    node_colors.append("yellow")
-            else:
-                node_colors.append("skyblue")
+    # Encode the binding modes as integer states and count every transition between consecutive frames
+    labels, first_frames, state_ids = np.unique(
+        sequence, return_index=True, return_inverse=True
+    )
+    states = labels.tolist()
+    transition_counts = np.zeros((len(states), len(states)), dtype=np.int64)
+    np.add.at(transition_counts, (state_ids[:-1], state_ids[1:]), 1)
+    state_occurrences = np.bincount(state_ids, minlength=len(states))
 
-        # Draw nodes with sizes correlated to occurrences and color top 10 nodes
-        node_size = [size_node * node_occurrences[node] for node in G.nodes()]
-        nx.draw_networkx_nodes(
-            G, pos, node_size=node_size, node_color=node_colors, alpha=0.8
-        )
+    # Divide the 'all_data' into three parts
+    part1_length = part_length + remaining_length
+    part2_length = part_length
+    part_bounds = [0, part1_length, part1_length + part2_length, total_length]
+
+    # Count the occurrences of each node in each part on views of the encoded states
+    part_node_occurrences = np.stack(
+        [
+            np.bincount(state_ids[start:end], minlength=len(states))
+            for start, end in zip(part_bounds, part_bounds[1:])
+        ]
+    )
+
+    # Get the top 10 nodes with the most occurrences, ties go to the node that appears first
+    top_10_ids = np.lexsort((first_frames, -state_occurrences))[:10]
+    top_10_nodes = frozenset(states[i] for i in top_10_ids.tolist())
+
+    # Convert the counts to percentages of all frames and to probabilities of leaving each state
+    occurrence_matrix = transition_counts * percentage_scale
+    probability_scale = 100.0 / state_occurrences
+    probability_matrix = transition_counts * probability_scale[:, None]
+
+    # Separate the self-loops from the pairs of Binding Modes with a transition in at least one direction
+    self_loop_ids = np.flatnonzero(np.diag(transition_counts))
+    pair_counts = transition_counts + transition_counts.T
+    pair_rows, pair_cols = np.nonzero(np.triu(pair_counts, k=1))
+
+    self_loop_occurences = {
+        states[i]: occurrence_matrix[i, i] for i in self_loop_ids.tolist()
+    }
 
-        # Draw node labels with occurrence percentage and self-loop probability for nodes with edges
-        node_labels = {}
-
-        for node in G.nodes():
-            if G.degree(node) > 0:  # Check if the node has at least one edge
-                edges_with_node = [
-                    (u, v, data["weight"])
-                    for u, v, data in G.edges(data=True)
-                    if u == node or v == node
-                ]
-                relevant_edges = [
-                    edge
-                    for edge in edges_with_node
-                    if edge[2] >= min_transition_percent
-                ]
-
-                if relevant_edges:
-                    if node in top_10_nodes:
-                        node_occurrence_percentage = (
-                            node_occurrences[node] / len(combined_dict["all"]) * 100
-                        )
-                        self_loop_probability = (
-                            self_loop_probabilities.get(node, 0) * 100
-                        )
-                        self_loop_occurence = self_loop_occurences.get(node, 0)
-                        node_label = f"{node}\nOccurrences: {node_occurrence_percentage:.2f}%\nSelf-Loop Probability: {self_loop_probability:.2f}% \nSelf-Loop Occurence: {self_loop_occurence:.2f}%"
-                        node_labels[node] = node_label
-                    else:
-                        node_labels[node] = node
-
-        nx.draw_networkx_labels(
-            G,
-            pos,
-            labels=node_labels,
-            font_size=font_size,
-            font_color="black",
-            verticalalignment="center",
+    # Collect both directions of every pair in a single pass over the upper triangle
+    transition_pairs = []
+    edge_labels = {}
+    for i, j in zip(pair_rows.tolist(), pair_cols.tolist()):
+        transition_pairs.append(
+            (states[i], states[j], occurrence_matrix[i, j], occurrence_matrix[j, i])
         )
 
-        # Add the legend to the plot
-        plt.legend(handles=legend_handles, loc="upper right", fontsize=48)
+        # Format the label of both edges once, the backward part of a label is only set if the reverse transition exists
+        for u, v in ((i, j), (j, i)):
+            has_reverse = transition_counts[v, u] > 0
+            forward_label = f"{occurrence_matrix[v, u]:.2f}% of Frames →, {probability_matrix[v, u]:.2f}% probability"
+            backward_label = f"{occurrence_matrix[u, v] if has_reverse else 0:.2f}% of Frames ←, {probability_matrix[u, v] if has_reverse else 0:.2f}% probability"
+            edge_labels[(states[u], states[v])] = f"{forward_label}\n{backward_label}"
 
-        plt.axis("off")
-        plt.tight_layout()
+    # Calculate self-loop probabilities in %
+    self_loop_probabilities = {
+        states[i]: probability_matrix[i, i] for i in self_loop_ids.tolist()
+    }
 
-        # Save the plot
-        plot_filename = f"markov_chain_plot_{min_transition_percent}.{fig_type}"
-        plot_path = os.path.join("Binding_Modes_Markov_States", plot_filename)
-        os.makedirs(
-            "Binding_Modes_Markov_States", exist_ok=True
-        )  # Create the folder if it doesn't exist
+    # Find the part of the trajectory each node appears in more than half of the time, if any
+    part_colors = ("green", "orange", "red")
+    majority_parts = part_node_occurrences.argmax(axis=0)
+    has_majority_part = part_node_occurrences.max(axis=0) > 0.5 * state_occurrences
+
+    # Node colors, sizes and labels do not depend on the threshold, so they are computed once in a single pass
+    node_color_map = {}
+    node_size_map = {}
+    node_label_map = {}
+    for state_id, node in enumerate(states):
+        occurrences = int(state_occurrences[state_id])
+        node_size_map[node] = size_node * occurrences
+
+        if node in top_10_nodes:
+            # Color the node based on the part it mostly appears in
+            if has_majority_part[state_id]:
+                node_color_map[node] = part_colors[majority_parts[state_id]]
+            else:
+                node_color_map[node] = "yellow"
 
-        plt.savefig(plot_path, dpi=300)
-        plt.clf()  # Clear the current figure for the next iteration
+            node_occurrence_percentage = occurrences * percentage_scale
+            self_loop_probability = self_loop_probabilities.get(node, 0)
+            self_loop_occurence = self_loop_occurences.get(node, 0)
+            node_label_map[node] = (
+                f"{node}\nOccurrences: {node_occurrence_percentage:.2f}%\nSelf-Loop Probability: {self_loop_probability:.2f}% \nSelf-Loop Occurence: {self_loop_occurence:.2f}%"
+            )
+        else:
+            node_color_map[node] = "skyblue"
+            node_label_map[node] = node
+
+    # Compute the layout once on the graph of all transitions so that every threshold shares the node positions
+    G_all = nx.DiGraph()
+    for state_a, state_b, _, _ in transition_pairs:
+        G_all.add_edges_from([(state_a, state_b), (state_b, state_a)])
+    G_all.add_edges_from((state, state) for state in self_loop_occurences)
+    pos = nx.spring_layout(
+        G_all, k=2, seed=42
+    )  # Increased distance between nodes (k=2)
+
+    os.makedirs(
+        "Binding_Modes_Markov_States", exist_ok=True
+    )  # Create the folder if it doesn't exist
+
+    # Generate the Markov Chain plots of the different tresholds, in parallel if more than one process is used
+    plot_threshold = partial(
+        markov_chain_plot,
+        pos=pos,
+        transition_pairs=transition_pairs,
+        self_loop_occurences=self_loop_occurences,
+        edge_labels=edge_labels,
+        node_color_map=node_color_map,
+        node_size_map=node_size_map,
+        node_label_map=node_label_map,
+        fig_type=fig_type,
+        font_size=font_size,
+        dpi=dpi,
+    )
+    processes = min(len(min_transitions), num_processes)
+    if processes > 1:
+        with Pool(processes=processes) as pool:
+            pool.map(plot_threshold, min_transitions)
+    else:
+        for min_transition in min_transitions:
+            plot_threshold(min_transition)
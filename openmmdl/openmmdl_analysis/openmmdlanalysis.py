@@ -20,11 +20,9 @@ import Bio
 import multiprocessing
 import functools
 from Bio import PDB
-import cairosvg
 from collections import Counter
 from rdkit import Chem
 from rdkit.Chem import AllChem, Draw
-from rdkit.Chem.Draw import rdMolDraw2D
 from plip.basic import config
 from MDAnalysis.analysis import rms
 from tqdm import tqdm
@@ -60,12 +58,11 @@ from openmmdl.openmmdl_analysis.markov_state_figure_generation import (
 )
 from openmmdl.openmmdl_analysis.rdkit_figure_generation import (
     split_interaction_data,
-    highlight_numbers,
     generate_interaction_dict,
     update_dict,
-    create_and_merge_images,
     arranged_figure_generation,
     generate_ligand_image,
+    generate_binding_mode_image,
 )
 from openmmdl.openmmdl_analysis.barcode_generation import (
     barcodegeneration,
@@ -213,6 +210,20 @@ def main():
         default="png",
     )
 
+    parser.add_argument(
+        "--in_memory",
+        dest="in_memory",
+        help="Load the trajectory into memory for the RMSD calculations. Faster, but needs enough RAM for the whole trajectory. True or False, defaults to False",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--gpu",
+        dest="use_gpu",
+        help="Calculate the RMSD matrix for the representative frames on the GPU with CuPy. True or False, defaults to False",
+        default=False,
+    )
+
     pdb_md = None
     input_formats = [
         ".pdb",
@@ -290,6 +301,8 @@ def main():
     fig_type = args.figure_type
 
     generate_representative_frame = args.representative_frame
+    use_gpu = str(args.use_gpu) == "True"
+    in_memory = str(args.in_memory) == "True"
 
     if reference != None:
         print("\033[1mPDB File residues are being renumbered\033[0m")
@@ -375,10 +388,16 @@ def main():
             fig_type,
             selection1="nucleicbackbone",
             selection2=["nucleic", f"resname {ligand}"],
+            in_memory=in_memory,
         )
         if frame_rmsd != "No":
             RMSD_dist_frames(
-                f"{topology}", f"{trajectory}", fig_type, lig=f"{ligand}", nucleic=True
+                f"{topology}",
+                f"{trajectory}",
+                fig_type,
+                lig=f"{ligand}",
+                nucleic=True,
+                in_memory=in_memory,
             )
             print("\033[1mRMSD calculated\033[0m")
     elif peptide != None:
@@ -388,9 +407,16 @@ def main():
             fig_type,
             selection1="backbone",
             selection2=["protein", f"chainID {peptide}"],
+            in_memory=in_memory,
         )
         if frame_rmsd != "No":
-            RMSD_dist_frames(f"{topology}", f"{trajectory}", fig_type, lig=f"chainID {peptide}")
+            RMSD_dist_frames(
+                f"{topology}",
+                f"{trajectory}",
+                fig_type,
+                lig=f"chainID {peptide}",
+                in_memory=in_memory,
+            )
             print("\033[1mRMSD calculated\033[0m")
     else:
         rmsd_for_atomgroups(
@@ -399,9 +425,16 @@ def main():
             fig_type,
             selection1="backbone",
             selection2=["protein", f"resname {ligand}"],
+            in_memory=in_memory,
         )
         if frame_rmsd != "No":
-            RMSD_dist_frames(f"{topology}", f"{trajectory}", fig_type, lig=f"{ligand}")
+            RMSD_dist_frames(
+                f"{topology}",
+                f"{trajectory}",
+                fig_type,
+                lig=f"{ligand}",
+                in_memory=in_memory,
+            )
             print("\033[1mRMSD calculated\033[0m")
 
     if receptor_nucleic:
@@ -549,7 +582,13 @@ def main():
     # Generate Markov state figures of the binding modes
     total_frames = len(pdb_md.trajectory) - 1
     min_transitions = min_transition_calculation(min_transition)
-    binding_site_markov_network(total_frames, min_transitions, combined_dict, fig_type)
+    binding_site_markov_network(
+        total_frames,
+        min_transitions,
+        combined_dict,
+        fig_type,
+        num_processes=cpu_count,
+    )
     print("\033[1mMarkov State Figure generated\033[0m")
 
     # Get the top 10 nodes with the most occurrences
@@ -587,128 +626,34 @@ def main():
         if peptide is None:
             matplotlib.use("Agg")
             binding_site = {}
-            merged_image_paths = []
+            with open("lig.smi", "r") as file:
+                reference_smiles = (
+                    file.read().strip()
+                )  # Read the SMILES from the file and remove any leading/trailing whitespace
+            reference_mol = Chem.MolFromSmiles(reference_smiles)
+            prepared_ligand = AllChem.AssignBondOrdersFromTemplate(
+                reference_mol, lig_rd
+            )
+            # Generate 2D coordinates for the molecule
+            AllChem.Compute2DCoords(prepared_ligand)
+            binding_mode_images = []
             for binding_mode, values in columns_with_value_1.items():
                 binding_site[binding_mode] = values
                 occurrence_count = top_10_nodes_with_occurrences[binding_mode]
                 occurrence_percent = 100 * occurrence_count / total_frames
-                with open("lig.smi", "r") as file:
-                    reference_smiles = (
-                        file.read().strip()
-                    )  # Read the SMILES from the file and remove any leading/trailing whitespace
-                reference_mol = Chem.MolFromSmiles(reference_smiles)
-                prepared_ligand = AllChem.AssignBondOrdersFromTemplate(
-                    reference_mol, lig_rd
-                )
-                # Generate 2D coordinates for the molecule
-                AllChem.Compute2DCoords(prepared_ligand)
-                split_data = split_interaction_data(values)
-                # Get the highlighted atom indices based on interaction type
-                (
-                    highlighted_hbond_donor,
-                    highlighted_hbond_acceptor,
-                    highlighted_hbond_both,
-                    highlighted_hydrophobic,
-                    highlighted_waterbridge,
-                    highlighted_pistacking,
-                    highlighted_halogen,
-                    highlighted_ni,
-                    highlighted_pi,
-                    highlighted_pication,
-                    highlighted_metal,
-                ) = highlight_numbers(split_data, starting_idx=lig_index)
-
-                # Generate a dictionary for hydrogen bond acceptors
-                hbond_acceptor_dict = generate_interaction_dict(
-                    "hbond_acceptor", highlighted_hbond_acceptor
-                )
-                # Generate a dictionary for hydrogen bond acceptors and donors
-                hbond_both_dict = generate_interaction_dict(
-                    "hbond_both", highlighted_hbond_both
-                )
-                # Generate a dictionary for hydrogen bond donors
-                hbond_donor_dict = generate_interaction_dict(
-                    "hbond_donor", highlighted_hbond_donor
-                )
-                # Generate a dictionary for hydrophobic features
-                hydrophobic_dict = generate_interaction_dict(
-                    "hydrophobic", highlighted_hydrophobic
-                )
-                # Generate a dictionary for water bridge interactions
-                waterbridge_dict = generate_interaction_dict(
-                    "waterbridge", highlighted_waterbridge
-                )
-                # Generate a dictionary for pistacking
-                pistacking_dict = generate_interaction_dict(
-                    "pistacking", highlighted_pistacking
-                )
-                # Generate a dictionary for halogen interactions
-                halogen_dict = generate_interaction_dict("halogen", highlighted_halogen)
-                # Generate a dictionary for negative ionizables
-                ni_dict = generate_interaction_dict("ni", highlighted_ni)
-                # Generate a dictionary for negative ionizables
-                pi_dict = generate_interaction_dict("pi", highlighted_pi)
-                # Generate a dictionary for pication
-                pication_dict = generate_interaction_dict(
-                    "pication", highlighted_pication
-                )
-                # Generate a dictionary for metal interactions
-                metal_dict = generate_interaction_dict("metal", highlighted_metal)
-
-                # Call the function to update hbond_donor_dict with values from other dictionaries
-                update_dict(
-                    hbond_donor_dict,
-                    hbond_acceptor_dict,
-                    ni_dict,
-                    pi_dict,
-                    hydrophobic_dict,
-                    hbond_both_dict,
-                    waterbridge_dict,
-                    pistacking_dict,
-                    halogen_dict,
-                    pication_dict,
-                    metal_dict,
-                )
-
-                # Convert the highlight_atoms to int type for rdkit drawer
-                highlight_atoms = [
-                    int(x)
-                    for x in highlighted_hbond_donor
-                    + highlighted_hbond_acceptor
-                    + highlighted_hbond_both
-                    + highlighted_ni
-                    + highlighted_pi
-                    + highlighted_hydrophobic
-                    + highlighted_waterbridge
-                    + highlighted_pistacking
-                    + highlighted_halogen
-                    + highlighted_pication
-                    + highlighted_metal
-                ]
-                highlight_atoms = list(set(highlight_atoms))
-
-                # Convert the RDKit molecule to SVG format with atom highlights
-                drawer = rdMolDraw2D.MolDraw2DSVG(600, 600)
-                drawer.DrawMolecule(
-                    prepared_ligand,
-                    highlightAtoms=highlight_atoms,
-                    highlightAtomColors=hbond_donor_dict,
-                )
-                drawer.FinishDrawing()
-                svg = drawer.GetDrawingText().replace("svg:", "")
-
-                # Save the SVG to a file
-                with open(f"{binding_mode}.svg", "w") as f:
-                    f.write(svg)
-
-                # Convert the svg to an png
-                cairosvg.svg2png(
-                    url=f"{binding_mode}.svg", write_to=f"{binding_mode}.png"
-                )
-
-                # Generate the interactions legend and combine it with the ligand png
-                merged_image_paths = create_and_merge_images(
-                    binding_mode, occurrence_percent, split_data, merged_image_paths
+                binding_mode_images.append((binding_mode, values, occurrence_percent))
+
+            # Draw the binding modes in parallel, the merged images are returned in the order of the binding modes
+            with multiprocessing.Pool(
+                processes=max(1, min(len(binding_mode_images), cpu_count))
+            ) as pool:
+                merged_image_paths = pool.starmap(
+                    functools.partial(
+                        generate_binding_mode_image,
+                        prepared_ligand=prepared_ligand,
+                        lig_index=lig_index,
+                    ),
+                    binding_mode_images,
                 )
 
             # Create Figure with all Binding modes
@@ -716,12 +661,13 @@ def main():
                 merged_image_paths, "all_binding_modes_arranged.png"
             )
             generate_ligand_image(
-                ligand, "complex.pdb", "lig_no_h.pdb", "lig.smi", f"ligand_numbering.svg"
+                ligand,
+                "complex.pdb",
+                "lig_no_h.pdb",
+                "lig.smi",
+                "ligand_numbering",
+                fig_type,
             )
-            if fig_type == "png":
-                cairosvg.svg2png(
-                    url=f"ligand_numbering.svg", write_to=f"ligand_numbering.png"
-                )
             print("\033[1mBinding mode figure generated\033[0m")
     except Exception as e:
         print(f"Ligand could not be recognized, use the -l option")
@@ -747,6 +693,7 @@ def main():
         DM = calculate_distance_matrix(
             pdb_md,
             f"protein or nucleic or resname {ligand} or resname {special_ligand}",
+            use_gpu=use_gpu,
         )
         modes_to_process = top_10_binding_modes.index
         for mode in tqdm(modes_to_process):
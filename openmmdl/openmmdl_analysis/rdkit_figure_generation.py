@@ -1,12 +1,42 @@
-import matplotlib.pyplot as plt
+import matplotlib
 import rdkit
 from rdkit import Chem
 from rdkit.Chem import AllChem, Draw
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 import cairosvg
-import pylab
 import os
 import MDAnalysis as mda
+from collections import Counter
+
+# RGB colors of the highlighted interactions
+INTERACTION_COLORS = {
+    "hbond_acceptor": (1.0, 0.6, 0.6),
+    "hbond_both": (0.6, 0.0, 0.5),
+    "hbond_donor": (0.3, 0.5, 1.0),
+    "hydrophobic": (1.0, 1.0, 0.0),
+    "waterbridge": (0.0, 1.0, 0.9),
+    "pistacking": (0.0, 0.0, 1.0),
+    "halogen": (1.0, 0.0, 0.9),
+    "ni": (0.0, 0.0, 1.0),
+    "pi": (1.0, 0.0, 0.0),
+    "pication": (0.0, 0.0, 1.0),
+    "metal": (1.0, 0.6, 0.0),
+}
+
+# Colors of the interaction labels in the legend, hbonds and saltbridges are keyed by their type
+LEGEND_COLORS = {
+    ("hbond", "Acceptor"): INTERACTION_COLORS["hbond_acceptor"],
+    ("hbond", "Donor"): INTERACTION_COLORS["hbond_donor"],
+    ("saltbridge", "NI"): INTERACTION_COLORS["ni"],
+    ("saltbridge", "PI"): INTERACTION_COLORS["pi"],
+    "hydrophobic": INTERACTION_COLORS["hydrophobic"],
+    "halogen": INTERACTION_COLORS["halogen"],
+    "pistacking": INTERACTION_COLORS["pistacking"],
+    "pication": INTERACTION_COLORS["pication"],
+    "waterbridge": INTERACTION_COLORS["waterbridge"],
+    "metal": INTERACTION_COLORS["metal"],
+}
 
 
 def generate_ligand_image(
@@ -14,16 +44,20 @@ def generate_ligand_image(
     complex_pdb_file,
     ligand_no_h_pdb_file,
     smiles_file,
-    output_svg_filename,
+    output_basename,
+    fig_type="svg",
+    image_size=(1600, 1000),
 ):
-    """Generates a SVG image of the ligand.
+    """Generates a SVG image of the ligand. If the figure type is png, a PNG image is additionally drawn with Cairo.
 
     Args:
         ligand_name (str): Name of the ligand in the protein-ligand complex topology.
         complex_pdb_file (str): Path to the protein-ligand complex PDB file.
         ligand_no_h_pdb_file (str): Path to the ligand PDB file without hydrogens.
         smiles_file (str): Path to the SMILES file with the reference ligand.
-        output_svg_filename (str): Name of the output SVG file.
+        output_basename (str): Name of the output image files without the file extension.
+        fig_type (str, optional): File type of the figures, only png adds a PNG image to the SVG. Defaults to "svg".
+        image_size (tuple, optional): Width and height of the image in pixels. Defaults to (1600, 1000).
     """
     try:
         # Load complex and ligand structures
@@ -46,35 +80,34 @@ def generate_ligand_image(
         AllChem.Compute2DCoords(prepared_ligand)
 
         # Map atom indices between ligand_no_h and complex
+        lig_name_by_index = {lig_atom.index: lig_atom.name for lig_atom in lig_noh}
+        complex_id_by_name = {
+            comp_lig.name: int(comp_lig.id) for comp_lig in complex_lig
+        }
         for atom in prepared_ligand.GetAtoms():
-            atom_index = atom.GetIdx()
-            for lig_atom in lig_noh:
-                lig_index = lig_atom.index
-                if atom_index == lig_index:
-                    lig_atom_name = lig_atom.name
-                    for comp_lig in complex_lig:
-                        comp_lig_name = comp_lig.name
-                        if lig_atom_name == comp_lig_name:
-                            num = int(comp_lig.id)
-                            atom.SetAtomMapNum(num)
-
-        # Generate a SVG image of the ligand without highlighting atoms
-        drawer = Draw.MolDraw2DSVG(5120, 3200)
-        drawer.drawOptions().addStereoAnnotation = (
-            True  # Add stereo information if available
-        )
-        drawer.DrawMolecule(prepared_ligand)
-
-        # Adjust font size in the SVG output using the FontSize method
-        font_size = drawer.FontSize()
-        drawer.SetFontSize(font_size * 0.5)  # You can adjust the multiplier as needed
-
-        drawer.FinishDrawing()
-        svg = drawer.GetDrawingText().replace("svg:", "")
-
-        # Save the SVG image to the specified output file
-        with open(output_svg_filename, "w") as f:
-            f.write(svg)
+            lig_atom_name = lig_name_by_index.get(atom.GetIdx())
+            num = complex_id_by_name.get(lig_atom_name)
+            if num is not None:
+                atom.SetAtomMapNum(num)
+
+        # Generate an image of the ligand without highlighting atoms, PNGs are drawn without the SVG detour
+        drawers = [(Draw.MolDraw2DSVG(*image_size), f"{output_basename}.svg")]
+        if fig_type == "png":
+            drawers.append((Draw.MolDraw2DCairo(*image_size), f"{output_basename}.png"))
+        for drawer, output_filename in drawers:
+            drawer.drawOptions().addStereoAnnotation = (
+                True  # Add stereo information if available
+            )
+            drawer.DrawMolecule(prepared_ligand)
+            drawer.FinishDrawing()
+            if output_filename.endswith(".png"):
+                drawer.WriteDrawingText(output_filename)
+            else:
+                svg = drawer.GetDrawingText()
+
+                # Save the SVG image to the specified output file
+                with open(output_filename, "w") as f:
+                    f.write(svg)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -136,162 +169,74 @@ def highlight_numbers(split_data, starting_idx):
     complex = mda.Universe("complex.pdb")
     ligand_no_h = mda.Universe("lig_no_h.pdb")
     lig_noh = ligand_no_h.select_atoms("all")
+    # map complex atom ids to the ids of the same atoms in the ligand without hydrogens
+    complex_name_by_id = {atom.id: atom.name for atom in complex.atoms}
+    lig_id_by_name = {atom.name: atom.id for atom in lig_noh}
+
+    # End of the ligand atom codes in the split item for each interaction type
+    code_ends = {
+        "hbond": -2,
+        "hydrophobic": -1,
+        "waterbridge": -2,
+        "pistacking": -1,
+        "halogen": -2,
+        "saltbridge": -3,
+        "pication": -2,
+        "metal": 2,
+    }
+    # Lists collecting the atoms, hbonds and saltbridges are split further by their type
+    highlighted_lists = {
+        ("hbond", "Donor"): highlighted_hbond_donor,
+        ("hbond", "Acceptor"): highlighted_hbond_acceptor,
+        ("saltbridge", "NI"): highlighted_ni,
+        ("saltbridge", "PI"): highlighted_pi,
+        "hydrophobic": highlighted_hydrophobic,
+        "waterbridge": highlighted_waterbridge,
+        "pistacking": highlighted_pistacking,
+        "halogen": highlighted_halogen,
+        "pication": highlighted_pication,
+        "metal": highlighted_metal,
+    }
 
     for item in split_data:
         parts = item.split()
-        protein_partner_name = parts[0]
-        numeric_codes = parts[1:-1]
         interaction_type = parts[-1]
-
-        if interaction_type == "hbond":
-            parts = item.split()
-            protein_partner_name = parts[0]
-            numeric_codes = parts[1:-2]
-            type = parts[-2]
-            interaction_type = parts[-1]
-            for code in numeric_codes:
-                atom_index = int(code)
-                complex_id = complex.select_atoms(f"id {atom_index}")
-                for atom in complex_id:
-                    atom_name = atom.name
-                for lig_atom in lig_noh:
-                    if lig_atom.name == atom_name:
-                        lig_real_index = lig_atom.id
-                if type == "Donor":
-                    highlighted_hbond_donor.append(lig_real_index - 1)
-                elif type == "Acceptor":
-                    highlighted_hbond_acceptor.append(lig_real_index - 1)
-
-        elif interaction_type == "hydrophobic":
-            parts = item.split()
-            protein_partner_name = parts[0]
-            numeric_codes = parts[1:-1]
-            interaction_type = parts[-1]
-            for code in numeric_codes:
-                atom_index = int(code)
-                complex_id = complex.select_atoms(f"id {atom_index}")
-                for atom in complex_id:
-                    atom_name = atom.name
-                for lig_atom in lig_noh:
-                    if lig_atom.name == atom_name:
-                        lig_real_index = lig_atom.id
-                highlighted_hydrophobic.append(lig_real_index - 1)
-
-        elif interaction_type == "waterbridge":
-            parts = item.split()
-            protein_partner_name = parts[0]
-            numeric_codes = parts[1:-2]
-            interaction_type = parts[-1]
-            for code in numeric_codes:
-                atom_index = int(code)
-                complex_id = complex.select_atoms(f"id {atom_index}")
-                for atom in complex_id:
-                    atom_name = atom.name
-                for lig_atom in lig_noh:
-                    if lig_atom.name == atom_name:
-                        lig_real_index = lig_atom.id
-                highlighted_waterbridge.append(lig_real_index - 1)
-
-        elif interaction_type == "pistacking":
-            parts = item.split()
-            protein_partner_name = parts[0]
-            numeric_codes = parts[1:-1]
-            print(numeric_codes)
-            interaction_type = parts[-1]
-            split_codes = numeric_codes[0].split(",")
-            print(split_codes)
-            for code in split_codes:
-                atom_index = int(code)
-                complex_id = complex.select_atoms(f"id {atom_index}")
-                for atom in complex_id:
-                    atom_name = atom.name
-                for lig_atom in lig_noh:
-                    if lig_atom.name == atom_name:
-                        lig_real_index = lig_atom.id
-                highlighted_pistacking.append(lig_real_index - 1)
-
-        elif interaction_type == "halogen":
-            parts = item.split()
-            protein_partner_name = parts[0]
-            numeric_codes = parts[1:-2]
-            interaction_type = parts[-1]
-            halogen_type = parts[-2]
-            for code in numeric_codes:
-                atom_index = int(code)
-                complex_id = complex.select_atoms(f"id {atom_index}")
-                for atom in complex_id:
-                    atom_name = atom.name
-                for lig_atom in lig_noh:
-                    if lig_atom.name == atom_name:
-                        lig_real_index = lig_atom.id
-                highlighted_halogen.append(lig_real_index - 1)
-
-        elif interaction_type == "saltbridge":
-            parts = item.split()
-            protein_partner_name = parts[0]
-            numeric_codes = parts[1:-3]
-            interaction_type = parts[-1]
-            saltbridge_type = parts[-2]
-            if saltbridge_type == "NI":
-                split_codes = numeric_codes[0].split(",")
-                numeric_values = [int(code) for code in split_codes]
-                for code in numeric_values:
-                    atom_index = int(code)
-                    complex_id = complex.select_atoms(f"id {atom_index}")
-                    for atom in complex_id:
-                        atom_name = atom.name
-                    for lig_atom in lig_noh:
-                        if lig_atom.name == atom_name:
-                            lig_real_index = lig_atom.id
-                    highlighted_ni.append(lig_real_index - 1)
-            if saltbridge_type == "PI":
-                for code in numeric_codes:
-                    atom_index = int(code)
-                    complex_id = complex.select_atoms(f"id {atom_index}")
-                    for atom in complex_id:
-                        atom_name = atom.name
-                    for lig_atom in lig_noh:
-                        if lig_atom.name == atom_name:
-                            lig_real_index = lig_atom.id
-                    highlighted_pi.append(lig_real_index - 1)
-
-        elif interaction_type == "pication":
-            parts = item.split()
-            protein_partner_name = parts[0]
-            numeric_codes = parts[1:-2]
-            interaction_type = parts[-1]
-            halogen_type = parts[-2]
-            for code in numeric_codes:
-                atom_index = int(code)
-                complex_id = complex.select_atoms(f"id {atom_index}")
-                for atom in complex_id:
-                    atom_name = atom.name
-                for lig_atom in lig_noh:
-                    if lig_atom.name == atom_name:
-                        lig_real_index = lig_atom.id
-                highlighted_pication.append(lig_real_index - 1)
-
-        elif interaction_type == "metal":
-            parts = item.split()
-            special_ligand = parts[0]
-            ligidx = parts[1]
-            metal_type = parts[2]
-            atom_index = int(ligidx)
-            complex_id = complex.select_atoms(f"id {atom_index}")
-            for atom in complex_id:
-                atom_name = atom.name
-            for lig_atom in lig_noh:
-                if lig_atom.name == atom_name:
-                    lig_real_index = lig_atom.id
-            highlighted_metal.append(lig_real_index - 1)
-
-    for value in highlighted_hbond_donor[
-        :
-    ]:  # Using a copy of the list to avoid modifying while iterating
-        if value in highlighted_hbond_acceptor:
-            highlighted_hbond_donor.remove(value)
-            highlighted_hbond_acceptor.remove(value)
+        if interaction_type not in code_ends:
+            continue
+        numeric_codes = parts[1 : code_ends[interaction_type]]
+        if interaction_type in ("hbond", "saltbridge"):
+            highlighted = highlighted_lists.get((interaction_type, parts[-2]))
+            if highlighted is None:
+                continue
+        else:
+            highlighted = highlighted_lists[interaction_type]
+        # Rings of pistacking and negative ionizable groups list their atoms comma separated
+        if interaction_type == "pistacking" or highlighted is highlighted_ni:
+            numeric_codes = numeric_codes[0].split(",")
+        for code in numeric_codes:
+            lig_real_index = lig_id_by_name.get(complex_name_by_id.get(int(code)))
+            if lig_real_index is None:
+                continue
+            highlighted.append(lig_real_index - 1)
+
+    # Atoms that are both donor and acceptor are paired off occurrence by occurrence with counters
+    acceptor_counts = Counter(highlighted_hbond_acceptor)
+    donor_only = []
+    for value in highlighted_hbond_donor:
+        if acceptor_counts[value] > 0:
+            acceptor_counts[value] -= 1
             highlighted_hbond_both.append(value)
+        else:
+            donor_only.append(value)
+    highlighted_hbond_donor = donor_only
+    both_counts = Counter(highlighted_hbond_both)
+    acceptor_only = []
+    for value in highlighted_hbond_acceptor:
+        if both_counts[value] > 0:
+            both_counts[value] -= 1
+        else:
+            acceptor_only.append(value)
+    highlighted_hbond_acceptor = acceptor_only
 
     return (
         highlighted_hbond_donor,
@@ -318,21 +263,7 @@ def generate_interaction_dict(interaction_type, keys):
     Returns:
         dict: A dictionary with the interaction types are associated with their respective RGB color codes.
     """
-    interaction_dict = {
-        "hbond_acceptor": (1.0, 0.6, 0.6),
-        "hbond_both": (0.6, 0.0, 0.5),
-        "hbond_donor": (0.3, 0.5, 1.0),
-        "hydrophobic": (1.0, 1.0, 0.0),
-        "waterbridge": (0.0, 1.0, 0.9),
-        "pistacking": (0.0, 0.0, 1.0),
-        "halogen": (1.0, 0.0, 0.9),
-        "ni": (0.0, 0.0, 1.0),
-        "pi": (1.0, 0.0, 0.0),
-        "pication": (0.0, 0.0, 1.0),
-        "metal": (1.0, 0.6, 0.0),
-    }
-
-    interaction_dict = {int(key): interaction_dict[interaction_type] for key in keys}
+    interaction_dict = {int(key): INTERACTION_COLORS[interaction_type] for key in keys}
 
     return interaction_dict
 
@@ -354,7 +285,7 @@ def update_dict(target_dict, *source_dicts):
 def create_and_merge_images(
     binding_mode, occurrence_percent, split_data, merged_image_paths
 ):
-    """Create and merge images to generate a legend for binding modes.
+    """Create and merge images to generate a legend for binding modes. The ligand PNG image is removed after merging.
 
     Args:
         binding_mode (str): Name of the binding mode.
@@ -365,107 +296,207 @@ def create_and_merge_images(
     Returns:
         list: Paths to the merged images.
     """
-    # Create the main figure and axis
-    fig = pylab.figure()
-    ax = fig.add_subplot(111)
-
-    # Data for the x-axis and random data for demonstration
-    x = range(10)
-    data_points = [pylab.randn(10) for _ in range(len(split_data))]
-
-    # Plot lines on the same axis and collect them into a list
-    lines = []
-    filtered_split_data = [entry for entry in split_data if "FRAME" not in entry]
-    for i, data in enumerate(filtered_split_data):
-        y = data_points[i]
-        label = data.split()[-1]
-        type = data.split()[-2]
-        if label == "hydrophobic":
-            (line,) = ax.plot(x, y, label=data, color=(1.0, 1.0, 0.0), linewidth=5.0)
-        elif label == "hbond":
-            if type == "Acceptor":
-                (line,) = ax.plot(
-                    x, y, label=data, color=(1.0, 0.6, 0.6), linewidth=5.0
-                )
-            elif type == "Donor":
-                (line,) = ax.plot(
-                    x, y, label=data, color=(0.3, 0.5, 1.0), linewidth=5.0
-                )
-        elif label == "halogen":
-            (line,) = ax.plot(x, y, label=data, color=(1.0, 0.0, 0.9), linewidth=5.0)
-        elif label == "pistacking":
-            (line,) = ax.plot(x, y, label=data, color=(0.0, 0.0, 1.0), linewidth=5.0)
-        elif label == "pication":
-            (line,) = ax.plot(x, y, label=data, color=(0.0, 0.0, 1.0), linewidth=5.0)
-        elif label == "waterbridge":
-            (line,) = ax.plot(x, y, label=data, color=(0.0, 1.0, 0.9), linewidth=5.0)
-        elif label == "metal":
-            (line,) = ax.plot(x, y, label=data, color=(1.0, 0.6, 0.0), linewidth=5.0)
-        elif label == "saltbridge":
-            if type == "NI":
-                (line,) = ax.plot(
-                    x, y, label=data, color=(0.0, 0.0, 1.0), linewidth=5.0
-                )
-            elif type == "PI":
-                (line,) = ax.plot(
-                    x, y, label=data, color=(1.0, 0.0, 0.0), linewidth=5.0
-                )
-        else:
-            (line,) = ax.plot(x, y, label=data)
-        lines.append(line)
-
-    # Create a separate figure for the legend
-    figlegend = pylab.figure(figsize=(8, 6))
-
-    # Add a legend to the subplot (ax) using the lines and full entries as labels
-    legend = figlegend.legend(lines, filtered_split_data, loc="center")
-
-    # Set the linewidth of the legend lines to be thicker
-    for line in legend.get_lines():
-        line.set_linewidth(5.0)
+    # Draw the legend directly with PIL on a white 800x600 canvas, using the DejaVu fonts shipped with matplotlib
+    legend_image = Image.new("RGB", (800, 600), "white")
+    draw = ImageDraw.Draw(legend_image)
+    font_dir = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+    title_font = ImageFont.truetype(os.path.join(font_dir, "DejaVuSans-Bold.ttf"), 17)
+    label_font = ImageFont.truetype(os.path.join(font_dir, "DejaVuSans.ttf"), 14)
 
     # Add text above the legend
-    figlegend.text(0.5, 0.9, f"{binding_mode}", ha="center", fontsize=12, weight="bold")
-    figlegend.text(
-        0.5,
-        0.85,
+    draw.text((400, 60), f"{binding_mode}", fill="black", font=title_font, anchor="ms")
+    draw.text(
+        (400, 90),
         f"Occurrence {occurrence_percent}%",
-        ha="center",
-        fontsize=12,
-        weight="bold",
+        fill="black",
+        font=title_font,
+        anchor="ms",
     )
 
-    # Save the legend figure to a file
-    legend_filename = f"{binding_mode}_legend.png"
-    figlegend.savefig(legend_filename)
+    # Size the legend box to the labels and center it on the canvas
+    filtered_split_data = [entry for entry in split_data if "FRAME" not in entry]
+    row_height = 20
+    swatch_length = 28
+    padding = 8
+    label_width = max(
+        (draw.textlength(data, font=label_font) for data in filtered_split_data),
+        default=0,
+    )
+    box_width = 2 * padding + swatch_length + padding + label_width
+    box_height = 2 * padding + row_height * len(filtered_split_data)
+    left = (800 - box_width) / 2
+    top = (600 - box_height) / 2
+    draw.rounded_rectangle(
+        (left, top, left + box_width, top + box_height),
+        radius=4,
+        fill="white",
+        outline=(204, 204, 204),
+    )
 
-    # Read the two images
-    image1 = Image.open(f"{binding_mode}.png")
-    image2 = Image.open(legend_filename)
+    # Add a colored swatch and the full entry as label for each interaction
+    for i, data in enumerate(filtered_split_data):
+        parts = data.split()
+        label = parts[-1]
+        type = parts[-2]
+        if label in ("hbond", "saltbridge"):
+            color = LEGEND_COLORS.get((label, type))
+        else:
+            color = LEGEND_COLORS.get(label)
+        # Interactions without a color are drawn in the first color of the matplotlib color cycle
+        if color is None:
+            color = matplotlib.colors.to_rgb(
+                matplotlib.rcParams["axes.prop_cycle"].by_key()["color"][0]
+            )
+        color = tuple(int(255 * c) for c in color)
+        y = top + padding + row_height * i + row_height / 2
+        x = left + padding
+        draw.line((x, y, x + swatch_length, y), fill=color, width=5)
+        draw.text(
+            (x + swatch_length + padding, y),
+            data,
+            fill="black",
+            font=label_font,
+            anchor="lm",
+        )
 
-    # Resize the first image
-    image1_size = image1.size
-    image2_size = image2.size
-    total_width = image1_size[0] + image2_size[0]
-    new_image = Image.new("RGB", (total_width, image1_size[1]))
-    new_image.paste(image1, (0, 0))
-    new_image.paste(image2, (image1_size[0], 0))
+    # Place the ligand image and the legend side by side on a white canvas as high as the taller of both
+    ligand_pixels = np.asarray(Image.open(f"{binding_mode}.png").convert("RGB"))
+    legend_pixels = np.asarray(legend_image)
+    merged_pixels = np.full(
+        (
+            max(ligand_pixels.shape[0], legend_pixels.shape[0]),
+            ligand_pixels.shape[1] + legend_pixels.shape[1],
+            3,
+        ),
+        255,
+        dtype=np.uint8,
+    )
+    merged_pixels[: ligand_pixels.shape[0], : ligand_pixels.shape[1]] = ligand_pixels
+    merged_pixels[: legend_pixels.shape[0], ligand_pixels.shape[1] :] = legend_pixels
 
     # Save the merged image
     merged_image_filename = f"{binding_mode}_merged.png"
-    new_image.save(merged_image_filename, "PNG")
+    Image.fromarray(merged_pixels).save(merged_image_filename, "PNG", compress_level=1)
 
     # Append the merged image path to the list
     merged_image_paths.append(merged_image_filename)
 
     # Remove the original files
     os.remove(f"{binding_mode}.png")
-    os.remove(legend_filename)
-    os.remove(f"{binding_mode}.svg")
 
     return merged_image_paths
 
 
+def generate_binding_mode_image(
+    binding_mode, values, occurrence_percent, prepared_ligand, lig_index
+):
+    """Generates the figure of a binding mode with the interacting ligand atoms highlighted and merges it with the legend of the interactions.
+    Only the merged PNG image is kept, the ligand drawing is rendered in memory.
+
+    Args:
+        binding_mode (str): Name of the binding mode.
+        values (set): Interactions of the binding mode.
+        occurrence_percent (float): The percentage of the binding mode occurrence.
+        prepared_ligand (rdkit.Chem.rdchem.Mol): Ligand with bond orders and 2D coordinates assigned.
+        lig_index (int): Starting index of the ligand atom indices.
+
+    Returns:
+        str: Path to the merged image.
+    """
+    split_data = split_interaction_data(values)
+    # Get the highlighted atom indices based on interaction type
+    (
+        highlighted_hbond_donor,
+        highlighted_hbond_acceptor,
+        highlighted_hbond_both,
+        highlighted_hydrophobic,
+        highlighted_waterbridge,
+        highlighted_pistacking,
+        highlighted_halogen,
+        highlighted_ni,
+        highlighted_pi,
+        highlighted_pication,
+        highlighted_metal,
+    ) = highlight_numbers(split_data, starting_idx=lig_index)
+
+    # Generate a dictionary for hydrogen bond acceptors
+    hbond_acceptor_dict = generate_interaction_dict(
+        "hbond_acceptor", highlighted_hbond_acceptor
+    )
+    # Generate a dictionary for hydrogen bond acceptors and donors
+    hbond_both_dict = generate_interaction_dict("hbond_both", highlighted_hbond_both)
+    # Generate a dictionary for hydrogen bond donors
+    hbond_donor_dict = generate_interaction_dict("hbond_donor", highlighted_hbond_donor)
+    # Generate a dictionary for hydrophobic features
+    hydrophobic_dict = generate_interaction_dict("hydrophobic", highlighted_hydrophobic)
+    # Generate a dictionary for water bridge interactions
+    waterbridge_dict = generate_interaction_dict("waterbridge", highlighted_waterbridge)
+    # Generate a dictionary for pistacking
+    pistacking_dict = generate_interaction_dict("pistacking", highlighted_pistacking)
+    # Generate a dictionary for halogen interactions
+    halogen_dict = generate_interaction_dict("halogen", highlighted_halogen)
+    # Generate a dictionary for negative ionizables
+    ni_dict = generate_interaction_dict("ni", highlighted_ni)
+    # Generate a dictionary for negative ionizables
+    pi_dict = generate_interaction_dict("pi", highlighted_pi)
+    # Generate a dictionary for pication
+    pication_dict = generate_interaction_dict("pication", highlighted_pication)
+    # Generate a dictionary for metal interactions
+    metal_dict = generate_interaction_dict("metal", highlighted_metal)
+
+    # Call the function to update hbond_donor_dict with values from other dictionaries
+    update_dict(
+        hbond_donor_dict,
+        hbond_acceptor_dict,
+        ni_dict,
+        pi_dict,
+        hydrophobic_dict,
+        hbond_both_dict,
+        waterbridge_dict,
+        pistacking_dict,
+        halogen_dict,
+        pication_dict,
+        metal_dict,
+    )
+
+    # Convert the highlight_atoms to int type for rdkit drawer
+    highlight_atoms = [
+        int(x)
+        for x in highlighted_hbond_donor
+        + highlighted_hbond_acceptor
+        + highlighted_hbond_both
+        + highlighted_ni
+        + highlighted_pi
+        + highlighted_hydrophobic
+        + highlighted_waterbridge
+        + highlighted_pistacking
+        + highlighted_halogen
+        + highlighted_pication
+        + highlighted_metal
+    ]
+    highlight_atoms = list(set(highlight_atoms))
+
+    # Convert the RDKit molecule to SVG format with atom highlights
+    drawer = Draw.MolDraw2DSVG(600, 600)
+    drawer.DrawMolecule(
+        prepared_ligand,
+        highlightAtoms=highlight_atoms,
+        highlightAtomColors=hbond_donor_dict,
+    )
+    drawer.FinishDrawing()
+    svg = drawer.GetDrawingText()
+
+    # Convert the svg to an png from memory, no intermediate SVG file is written
+    cairosvg.svg2png(bytestring=svg.encode("utf-8"), write_to=f"{binding_mode}.png")
+
+    # Generate the interactions legend and combine it with the ligand png
+    merged_image_paths = create_and_merge_images(
+        binding_mode, occurrence_percent, split_data, []
+    )
+
+    return merged_image_paths[0]
+
+
 def arranged_figure_generation(merged_image_paths, output_path):
     """Generate an arranged figure by arranging merged images in rows and columns.
 
@@ -488,28 +519,21 @@ def arranged_figure_generation(merged_image_paths, output_path):
     total_width = max_width * images_per_row
     total_height = max_height * num_rows
 
-    # Create a new image with the calculated width and height
-    big_figure = Image.new(
-        "RGB", (total_width, total_height), (255, 255, 255)
-    )  # Set background to white
-
-    x_offset = 0
-    y_offset = 0
-
-    for image in merged_images:
-        # Paste the image onto the big figure
-        big_figure.paste(image, (x_offset, y_offset))
-
-        # Update offsets
-        x_offset += max_width
-
-        # Move to the next row if necessary
-        if x_offset >= total_width:
-            x_offset = 0
-            y_offset += max_height
-
-    # Save the big figure
-    big_figure.save(output_path, "PNG")
+    # Create a white canvas with the calculated width and height
+    canvas = np.full((total_height, total_width, 3), 255, dtype=np.uint8)
+
+    for index, image in enumerate(merged_images):
+        # Copy the image into its cell of the canvas, filling the rows from left to right
+        row, column = divmod(index, images_per_row)
+        pixels = np.asarray(image.convert("RGB"))
+        y_offset = row * max_height
+        x_offset = column * max_width
+        canvas[
+            y_offset : y_offset + pixels.shape[0], x_offset : x_offset + pixels.shape[1]
+        ] = pixels
+
+    # Save the big figure with light compression, the default level dominates the runtime
+    Image.fromarray(canvas).save(output_path, "PNG", compress_level=1)
 
     # Rename the merged image
     os.rename(
@@ -8,9 +8,17 @@ import MDAnalysis as mda
 from MDAnalysis.analysis import rms, diffusionmap
 from MDAnalysis.analysis.distances import dist
 
+# Directory the RMSD tables and plots are written to
+RMSD_OUTPUT_DIRECTORY = "./RMSD/"
+
 
 def rmsd_for_atomgroups(
-    prot_lig_top_file, prot_lig_traj_file, fig_type, selection1, selection2=None
+    prot_lig_top_file,
+    prot_lig_traj_file,
+    fig_type,
+    selection1,
+    selection2=None,
+    in_memory=False,
 ):
     """Calulate the RMSD for selected atom groups, and save the csv file and plot.
 
@@ -19,11 +27,12 @@ def rmsd_for_atomgroups(
         prot_lig_traj_file (str): Name of the input DCD file
         selection1 (str): Selection string for main atom group, also used during alignment.
         selection2 (list, optional): Selection strings for additional atom groups. Defaults to None.
+        in_memory (bool, optional): Load the whole trajectory into memory before the analysis. Defaults to False.
 
     Returns:
         pandas dataframe: rmsd_df. DataFrame containing RMSD of the selected atom groups over time.
     """
-    universe = mda.Universe(prot_lig_top_file, prot_lig_traj_file)
+    universe = mda.Universe(prot_lig_top_file, prot_lig_traj_file, in_memory=in_memory)
     universe.trajectory[0]
     ref = universe
     rmsd_analysis = rms.RMSD(
@@ -35,21 +44,27 @@ def rmsd_for_atomgroups(
     rmsd_df.index.name = "frame"
 
     # Create the directory if it doesn't exist
-    output_directory = "./RMSD/"
-    os.makedirs(output_directory, exist_ok=True)
+    os.makedirs(RMSD_OUTPUT_DIRECTORY, exist_ok=True)
 
     # Save the RMSD values to a CSV file in the created directory
-    rmsd_df.to_csv("./RMSD/RMSD_over_time.csv", sep=" ")
+    rmsd_df.to_csv(f"{RMSD_OUTPUT_DIRECTORY}RMSD_over_time.csv", sep=" ")
 
     # Plot and save the RMSD over time as a PNG file
     rmsd_df.plot(title="RMSD of protein and ligand")
     plt.ylabel("RMSD (Å)")
-    plt.savefig(f"./RMSD/RMSD_over_time.{fig_type}")
+    plt.savefig(f"{RMSD_OUTPUT_DIRECTORY}RMSD_over_time.{fig_type}")
 
     return rmsd_df
 
 
-def RMSD_dist_frames(prot_lig_top_file, prot_lig_traj_file, fig_type, lig, nucleic=False):
+def RMSD_dist_frames(
+    prot_lig_top_file,
+    prot_lig_traj_file,
+    fig_type,
+    lig,
+    nucleic=False,
+    in_memory=False,
+):
     """Calculate the RMSD between all frames in a matrix.
 
     Args:
@@ -57,12 +72,13 @@ def RMSD_dist_frames(prot_lig_top_file, prot_lig_traj_file, fig_type, lig, nucle
         prot_lig_traj_file (str): Name of the input DCD file
         lig (str): ligand name saved in the above pdb file. Selection string for the atomgroup to be investigated, also used during alignment.
         nucleic (bool, optional): Bool indicating if the receptor to be analyzed contains nucleic acids. Defaults to False.
+        in_memory (bool, optional): Load the whole trajectory into memory once, so the receptor and ligand matrices are not both read from disk. Defaults to False.
 
     Returns:
         np.array: pairwise_rmsd_prot. Numpy array of RMSD values for pairwise protein structures.
         np.array: pairwise_rmsd_lig. Numpy array of RMSD values for ligand structures.
     """
-    universe = mda.Universe(prot_lig_top_file, prot_lig_traj_file)
+    universe = mda.Universe(prot_lig_top_file, prot_lig_traj_file, in_memory=in_memory)
     if nucleic:
         pairwise_rmsd_prot = (
             diffusionmap.DistanceMatrix(universe, select="nucleic").run().dist_matrix
@@ -96,5 +112,7 @@ def RMSD_dist_frames(prot_lig_top_file, prot_lig_traj_file, fig_type, lig, nucle
 
     fig.colorbar(img1, ax=ax, orientation="horizontal", fraction=0.1, label="RMSD (Å)")
 
-    plt.savefig(f"./RMSD/RMSD_between_the_frames.{fig_type}")
+    # Create the directory if it doesn't exist
+    os.makedirs(RMSD_OUTPUT_DIRECTORY, exist_ok=True)
+    plt.savefig(f"{RMSD_OUTPUT_DIRECTORY}RMSD_between_the_frames.{fig_type}")
     return pairwise_rmsd_prot, pairwise_rmsd_lig
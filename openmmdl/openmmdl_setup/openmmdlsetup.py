@@ -21,6 +21,8 @@ from flask import (
 from werkzeug.utils import secure_filename
 from multiprocessing import Process, Pipe
 import datetime
+import functools
+import json
 import os
 import shutil
 import signal
@@ -49,6 +51,89 @@ fixer = None
 scriptOutput = None
 simulationProcess = None
 
+# ASCII art logo placed at the top of the generated Amber bash script
+AMBER_SCRIPT_LOGO = """
+        #       ,-----.    .-------.     .-''-.  ,---.   .--.,---.    ,---.,---.    ,---. ______       .---.      
+        #     .'  .-,  '.  \  _(`)_ \  .'_ _   \ |    \  |  ||    \  /    ||    \  /    ||    _ `''.   | ,_|      
+        #    / ,-.|  \ _ \ | (_ o._)| / ( ` )   '|  ,  \ |  ||  ,  \/  ,  ||  ,  \/  ,  || _ | ) _  \,-./  )      
+        #   ;  \  '_ /  | :|  (_,_) /. (_ o _)  ||  |\_ \|  ||  |\_   /|  ||  |\_   /|  ||( ''_'  ) |\  '_ '`)    
+        #   |  _`,/ \ _/  ||   '-.-' |  (_,_)___||  _( )_\  ||  _( )_/ |  ||  _( )_/ |  || . (_) `. | > (_)  )    
+        #   : (  '\_/ \   ;|   |     '  \   .---.| (_ o _)  || (_ o _) |  || (_ o _) |  ||(_    ._) '(  .  .-'    
+        #    \ `"/  \  ) / |   |      \  `-'    /|  (_,_)\  ||  (_,_)  |  ||  (_,_)  |  ||  (_.\.' /  `-'`-'|___  
+        #     '. \_/``".'  /   )       \       / |  |    |  ||  |      |  ||  |      |  ||       .'    |        \ 
+        #       '-----'    `---'        `'-..-'  '--'    '--''--'      '--''--'      '--''-----'`      `--------` 
+                                                                                                      
+                                                                                                      
+    """
+
+# Constraint lines of the system configuration for each constraints option
+CONSTRAINT_LINES = {
+    "none": ["constraints = None", "rigidWater = False"],
+    "water": ["constraints = None", "rigidWater = True"],
+    "hbonds": ["constraints = app.HBonds", "rigidWater = True"],
+    "allbonds": ["constraints = app.AllBonds", "rigidWater = True"],
+}
+
+# Fixed sections of the simulation script, filled in from the session options
+MEMBRANE_SETTINGS_TEMPLATE = """
+############# Membrane Settings ###################
+
+add_membrane = {add_membrane}
+membrane_lipid_type = '{lipidType}'
+membrane_padding = {membrane_padding}
+membrane_ionicstrength = {membrane_ionicstrength}
+membrane_positive_ion = '{membrane_positive}'
+membrane_negative_ion = '{membrane_negative}'"""
+
+WATER_BOX_BUFFER_TEMPLATE = """
+############# Water Box Settings ###################
+
+add_membrane = {add_membrane}
+Water_Box = "Buffer"
+water_padding_distance = {water_padding_distance}
+water_boxShape = '{water_boxShape}'
+water_ionicstrength = {water_ionicstrength}
+water_positive_ion = '{water_positive}'
+water_negative_ion = '{water_negative}'"""
+
+WATER_BOX_ABSOLUTE_TEMPLATE = """
+############# Water Box Settings ###################
+
+add_membrane = {add_membrane}
+Water_Box = "Absolute"
+water_box_x = {box_x}
+water_box_y = {box_y}
+water_box_z = {box_z}
+water_ionicstrength = {water_ionicstrength}
+water_positive_ion = '{water_positive}'
+water_negative_ion = '{water_negative}'"""
+
+INTEGRATION_OPTIONS_TEMPLATE = """
+# Integration Options
+
+step_time = {dt}
+dt = {dt}*unit.picoseconds
+temperature = {temperature}*unit.kelvin
+friction = {friction}/unit.picosecond"""
+
+BAROSTAT_OPTIONS_TEMPLATE = """pressure = {pressure}*unit.atmospheres
+barostatInterval = {barostatInterval}"""
+
+# ASCII art logo placed at the top of the generated simulation script
+OPENMMDL_LOGO = """
+#       ,-----.    .-------.     .-''-.  ,---.   .--.,---.    ,---.,---.    ,---. ______       .---.      
+#     .'  .-,  '.  \  _(`)_ \  .'_ _   \ |    \  |  ||    \  /    ||    \  /    ||    _ `''.   | ,_|      
+#    / ,-.|  \ _ \ | (_ o._)| / ( ` )   '|  ,  \ |  ||  ,  \/  ,  ||  ,  \/  ,  || _ | ) _  \,-./  )      
+#   ;  \  '_ /  | :|  (_,_) /. (_ o _)  ||  |\_ \|  ||  |\_   /|  ||  |\_   /|  ||( ''_'  ) |\  '_ '`)    
+#   |  _`,/ \ _/  ||   '-.-' |  (_,_)___||  _( )_\  ||  _( )_/ |  ||  _( )_/ |  || . (_) `. | > (_)  )    
+#   : (  '\_/ \   ;|   |     '  \   .---.| (_ o _)  || (_ o _) |  || (_ o _) |  ||(_    ._) '(  .  .-'    
+#    \ `"/  \  ) / |   |      \  `-'    /|  (_,_)\  ||  (_,_)  |  ||  (_,_)  |  ||  (_.\.' /  `-'`-'|___  
+#     '. \_/``".'  /   )       \       / |  |    |  ||  |      |  ||  |      |  ||       .'    |        \ 
+#       '-----'    `---'        `'-..-'  '--'    '--''--'      '--''--'      '--''-----'`      `--------` 
+                                                                                                      
+                                                                                                      
+"""
+
 
 def saveUploadedFiles():
     uploadedFiles.clear()
@@ -290,21 +375,7 @@ def createAmberBashScript():
     a_script.append(
         "# This script was generated by OpenMMDL-Setup on %s.\n" % datetime.date.today()
     )
-    a_script.append(
-        """
-        #       ,-----.    .-------.     .-''-.  ,---.   .--.,---.    ,---.,---.    ,---. ______       .---.      
-        #     .'  .-,  '.  \  _(`)_ \  .'_ _   \ |    \  |  ||    \  /    ||    \  /    ||    _ `''.   | ,_|      
-        #    / ,-.|  \ _ \ | (_ o._)| / ( ` )   '|  ,  \ |  ||  ,  \/  ,  ||  ,  \/  ,  || _ | ) _  \,-./  )      
-        #   ;  \  '_ /  | :|  (_,_) /. (_ o _)  ||  |\_ \|  ||  |\_   /|  ||  |\_   /|  ||( ''_'  ) |\  '_ '`)    
-        #   |  _`,/ \ _/  ||   '-.-' |  (_,_)___||  _( )_\  ||  _( )_/ |  ||  _( )_/ |  || . (_) `. | > (_)  )    
-        #   : (  '\_/ \   ;|   |     '  \   .---.| (_ o _)  || (_ o _) |  || (_ o _) |  ||(_    ._) '(  .  .-'    
-        #    \ `"/  \  ) / |   |      \  `-'    /|  (_,_)\  ||  (_,_)  |  ||  (_,_)  |  ||  (_.\.' /  `-'`-'|___  
-        #     '. \_/``".'  /   )       \       / |  |    |  ||  |      |  ||  |      |  ||       .'    |        \ 
-        #       '-----'    `---'        `'-..-'  '--'    '--''--'      '--''--'      '--''-----'`      `--------` 
-                                                                                                      
-                                                                                                      
-    """
-    )
+    a_script.append(AMBER_SCRIPT_LOGO)
 
     a_script.append("#!/bin/bash\n")
 
@@ -1084,6 +1155,21 @@ def configureDefaultOptions():
 
 
 def createScript(isInternal=False):
+    # The script only depends on the session options, the names of the uploaded files,
+    # isInternal and the date, so repeated previews and downloads reuse the cached text
+    fileNames = {
+        key: [name for _, name in files] for key, files in uploadedFiles.items()
+    }
+    key = json.dumps(
+        [dict(session), fileNames, isInternal, str(datetime.date.today())],
+        sort_keys=True,
+    )
+    return generateScript(key)
+
+
+@functools.lru_cache(maxsize=128)
+def generateScript(key):
+    options, fileNames, isInternal, today = json.loads(key)
     script = []
 
     # If we are creating this script for internal use to run a simulation directly, add extra code at the top
@@ -1108,24 +1194,9 @@ os.chdir(outputDir)"""
     # Header
 
     script.append(
-        "# This script was generated by OpenMM-MDL Setup on %s.\n"
-        % datetime.date.today()
-    )
-    script.append(
-        """
-#       ,-----.    .-------.     .-''-.  ,---.   .--.,---.    ,---.,---.    ,---. ______       .---.      
-#     .'  .-,  '.  \  _(`)_ \  .'_ _   \ |    \  |  ||    \  /    ||    \  /    ||    _ `''.   | ,_|      
-#    / ,-.|  \ _ \ | (_ o._)| / ( ` )   '|  ,  \ |  ||  ,  \/  ,  ||  ,  \/  ,  || _ | ) _  \,-./  )      
-#   ;  \  '_ /  | :|  (_,_) /. (_ o _)  ||  |\_ \|  ||  |\_   /|  ||  |\_   /|  ||( ''_'  ) |\  '_ '`)    
-#   |  _`,/ \ _/  ||   '-.-' |  (_,_)___||  _( )_\  ||  _( )_/ |  ||  _( )_/ |  || . (_) `. | > (_)  )    
-#   : (  '\_/ \   ;|   |     '  \   .---.| (_ o _)  || (_ o _) |  || (_ o _) |  ||(_    ._) '(  .  .-'    
-#    \ `"/  \  ) / |   |      \  `-'    /|  (_,_)\  ||  (_,_)  |  ||  (_,_)  |  ||  (_.\.' /  `-'`-'|___  
-#     '. \_/``".'  /   )       \       / |  |    |  ||  |      |  ||  |      |  ||       .'    |        \ 
-#       '-----'    `---'        `'-..-'  '--'    '--''--'      '--''--'      '--''-----'`      `--------` 
-                                                                                                      
-                                                                                                      
-"""
+        f"# This script was generated by OpenMM-MDL Setup on {today}.\n"
     )
+    script.append(OPENMMDL_LOGO)
     script.append(
         "from openmmdl.openmmdl_simulation.scripts.forcefield_water import ff_selection, water_forcefield_selection, water_model_selection, generate_forcefield, generate_transitional_forcefield"
     )
@@ -1152,54 +1223,55 @@ os.chdir(outputDir)"""
     script.append("import sys")
     script.append("import os")
     script.append("import shutil")
-    if session["openmmdl_analysis"] == "Yes":
+    if options["openmmdl_analysis"] == "Yes":
         script.append("import subprocess")
 
     # Input files
     script.append("\n# Input Files")
-    fileType = session["fileType"]
+    fileType = options["fileType"]
     if fileType == "pdb":
         script.append("""############# Ligand and Protein Data ###################""")
         script.append(
             """########   Add the Ligand SDF File and Protein PDB File in the Folder with the Script  ######### \n"""
         )
-        pdbType = session["pdbType"]
+        pdbType = options["pdbType"]
         if pdbType == "pdb":
-            script.append('protein = "%s"' % uploadedFiles["file"][0][1])
-            if session["sdfFile"] != "":
-                script.append("ligand = '%s'" % session["sdfFile"])
+            protein_file = fileNames["file"][0]
+            script.append(f'protein = "{protein_file}"')
+            if options["sdfFile"] != "":
+                script.append(f"ligand = '{options['sdfFile']}'")
                 script.append('ligand_name = "UNK"')
-                script.append("minimization = %s" % session["ligandMinimization"])
-                script.append("sanitization = %s" % session["ligandSanitization"])
-            forcefield = session["forcefield"]
-            water = session["waterModel"]
+                script.append(f"minimization = {options['ligandMinimization']}")
+                script.append(f"sanitization = {options['ligandSanitization']}")
+            water = options["waterModel"]
     elif fileType == "amber":
         script.append(
             """####### Add the Amber Files in the Folder with this Script ####### \n"""
         )
         # amber_files related variables
-        if session["has_files"] == "yes":
-            script.append("prmtop_file = '%s'" % uploadedFiles["prmtopFile"][0][1])
-            script.append('inpcrd_file = "%s"' % uploadedFiles["inpcrdFile"][0][1])
+        if options["has_files"] == "yes":
+            script.append(f"prmtop_file = '{fileNames['prmtopFile'][0]}'")
+            inpcrd_file = fileNames["inpcrdFile"][0]
+            script.append(f'inpcrd_file = "{inpcrd_file}"')
 
             # ligand related variables
-            if session["nmLig"] == True:
-                nmLigName = session["nmLigName"]  # e.g. 'UNL'
+            if options["nmLig"] == True:
+                nmLigName = options["nmLigName"]  # e.g. 'UNL'
             else:
                 nmLigName = None
 
-            if session["spLig"] == True:  # success
-                spLigName = session["spLigName"]  # e.g. 'HEME'
+            if options["spLig"] == True:  # success
+                spLigName = options["spLigName"]  # e.g. 'HEME'
             else:
                 spLigName = None
 
-        elif session["has_files"] == "no":
-            script.append("prmtop_file = 'system.%s.prmtop'" % session["water_ff"])
-            script.append("inpcrd_file = 'system.%s.inpcrd' " % session["water_ff"])
+        elif options["has_files"] == "no":
+            script.append(f"prmtop_file = 'system.{options['water_ff']}.prmtop'")
+            script.append(f"inpcrd_file = 'system.{options['water_ff']}.inpcrd' ")
 
             # ligand related variables
-            if session["nmLig"] == True:
-                nmLigFileName = uploadedFiles["nmLigFile"][0][1]  # e.g. '8QY.pdb'
+            if options["nmLig"] == True:
+                nmLigFileName = fileNames["nmLigFile"][0]  # e.g. '8QY.pdb'
                 nmLigName = extractLigName(
                     nmLigFileName
                 )  # e.g '8QY' or 'UNL' # resname in topology
@@ -1207,8 +1279,8 @@ os.chdir(outputDir)"""
                 nmLigFileName = None
                 nmLigName = None
 
-            if session["spLig"] == True:  # success
-                spLigFileName = uploadedFiles["spLigFile"][0][1]
+            if options["spLig"] == True:  # success
+                spLigFileName = fileNames["spLigFile"][0]
                 spLigName = extractLigName(spLigFileName)
             else:
                 spLigFileName = None
@@ -1218,77 +1290,31 @@ os.chdir(outputDir)"""
         script.append("prmtop = AmberPrmtopFile(prmtop_file)")
         script.append("inpcrd = AmberInpcrdFile(inpcrd_file)")
 
-        ##################### For debugging #################################
-        # print all key-value pairs in session
-        # print(f"session is {session}")
-        print(f"fileType is {fileType}")
-        print(f"session['has_files'] is {session['has_files']}")
-        print(f"session['nmLig'] is {session['nmLig']}")
-        print(f"session['spLig'] is {session['spLig']}")
-        print(f"nmLigName is {nmLigName}")
-        print(f"spLigName is {spLigName}")
-        # print(f"nmLigFileName is {nmLigFileName}")
-        # print(f"nmLigName is {nmLigName}")
-        # print(f"spLigFileName is {spLigFileName}")
-        # print(f"spLigName is {spLigName}")
-        ######################################################################
-
     if fileType == "pdb":
         script.append(
             """\n############# Forcefield, Water and Membrane Model Selection ###################\n"""
         )
-        script.append("ff = '%s'" % session["forcefield"])
+        script.append(f"ff = '{options['forcefield']}'")
         if water != "None":
-            script.append("water = '%s'" % water)
+            script.append(f"water = '{water}'")
         else:
-            script.append("water = %s" % water)
+            script.append(f"water = {water}")
 
     ################################## IF CLEANING WAS PERFORMED ##############################################
     ###########################################################################################################
     ###########################################################################################################
     if fileType == "pdb":
-        if session["solvent"] == True:
-            if session["add_membrane"] == True:
-                script.append(
-                    """\n############# Membrane Settings ###################\n"""
-                )
-                script.append("add_membrane = %s" % session["add_membrane"])
-                script.append("membrane_lipid_type = '%s'" % session["lipidType"])
-                script.append("membrane_padding = %s" % session["membrane_padding"])
-                script.append(
-                    "membrane_ionicstrength = %s" % session["membrane_ionicstrength"]
-                )
-                script.append(
-                    "membrane_positive_ion = '%s'" % session["membrane_positive"]
-                )
-                script.append(
-                    "membrane_negative_ion = '%s'" % session["membrane_negative"]
-                )
-            elif session["add_membrane"] == False:
-                script.append(
-                    """\n############# Water Box Settings ###################\n"""
-                )
-                script.append("add_membrane = %s" % session["add_membrane"])
-                if session["water_padding"] == True:
-                    script.append('Water_Box = "Buffer"')
-                    script.append(
-                        "water_padding_distance = %s"
-                        % session["water_padding_distance"]
-                    )
-                    script.append("water_boxShape = '%s'" % session["water_boxShape"])
+        if options["solvent"] == True:
+            if options["add_membrane"] == True:
+                script.append(MEMBRANE_SETTINGS_TEMPLATE.format_map(options))
+            elif options["add_membrane"] == False:
+                if options["water_padding"] == True:
+                    script.append(WATER_BOX_BUFFER_TEMPLATE.format_map(options))
                 else:
-                    script.append('Water_Box = "Absolute"')
-                    script.append("water_box_x = %s" % session["box_x"])
-                    script.append("water_box_y = %s" % session["box_y"])
-                    script.append("water_box_z = %s" % session["box_z"])
-                script.append(
-                    "water_ionicstrength = %s" % session["water_ionicstrength"]
-                )
-                script.append("water_positive_ion = '%s'" % session["water_positive"])
-                script.append("water_negative_ion = '%s'" % session["water_negative"])
+                    script.append(WATER_BOX_ABSOLUTE_TEMPLATE.format_map(options))
         else:
-            if session["solvent"] == False:
-                script.append("Solvent = %s" % session["solvent"])
+            if options["solvent"] == False:
+                script.append(f"Solvent = {options['solvent']}")
 
     ################################## IF CLEANING WAS NOT PERFORMED ##########################################
     ###########################################################################################################
@@ -1296,135 +1322,105 @@ os.chdir(outputDir)"""
 
     # System configuration
     script.append("\n# System Configuration\n")
-    nonbondedMethod = session["nonbondedMethod"]
-    script.append("nonbondedMethod = app.%s" % nonbondedMethod)
+    nonbondedMethod = options["nonbondedMethod"]
+    script.append(f"nonbondedMethod = app.{nonbondedMethod}")
     if nonbondedMethod != "NoCutoff":
-        script.append("nonbondedCutoff = %s*unit.nanometers" % session["cutoff"])
+        script.append(f"nonbondedCutoff = {options['cutoff']}*unit.nanometers")
     if nonbondedMethod == "PME":
-        script.append("ewaldErrorTolerance = %s" % session["ewaldTol"])
-    constraints = session["constraints"]
-    constraintMethods = {
-        "none": "None",
-        "water": "None",
-        "hbonds": "HBonds",
-        "allbonds": "AllBonds",
-    }
-    if constraints != "none" and constraints != "water":
-        script.append("constraints = app.%s" % constraintMethods[constraints])
-    if constraints == "none":
-        script.append("constraints = %s" % constraintMethods[constraints])
-    script.append("rigidWater = %s" % ("False" if constraints == "none" else "True"))
+        script.append(f"ewaldErrorTolerance = {options['ewaldTol']}")
+    constraints = options["constraints"]
+    script.extend(CONSTRAINT_LINES[constraints])
     if constraints != "none":
-        script.append("constraintTolerance = %s" % session["constraintTol"])
-    if session["hmr"]:
-        script.append("hydrogenMass = %s*unit.amu" % session["hmrMass"])
+        script.append(f"constraintTolerance = {options['constraintTol']}")
+    hmr = options["hmr"]
+    if hmr:
+        script.append(f"hydrogenMass = {options['hmrMass']}*unit.amu")
 
     # Integration options
 
-    script.append("\n# Integration Options\n")
-    script.append("step_time = %s" % session["dt"])
-    script.append("dt = %s*unit.picoseconds" % session["dt"])
-    script.append("temperature = %s*unit.kelvin" % session["temperature"])
-    script.append("friction = %s/unit.picosecond" % session["friction"])
-    ensemble = session["ensemble"]
+    script.append(INTEGRATION_OPTIONS_TEMPLATE.format_map(options))
+    ensemble = options["ensemble"]
     if ensemble == "npt":
-        script.append("pressure = %s*unit.atmospheres" % session["pressure"])
-        script.append("barostatInterval = %s" % session["barostatInterval"])
+        script.append(BAROSTAT_OPTIONS_TEMPLATE.format_map(options))
 
     # Simulation options
 
     script.append("\n# Simulation Options\n")
-    script.append("sim_length = %s" % session["sim_length"])
+    script.append(f"sim_length = {options['sim_length']}")
     script.append("steps = int(sim_length / step_time * 1000)")
     script.extend(
         [
-            "dcdFrames = %s" % session["dcdFrames"],
+            f"dcdFrames = {options['dcdFrames']}",
             "dcdInterval = int(steps / dcdFrames)",
         ]
     )
     script.extend(
         [
-            "pdbInterval_ns = %s" % session["pdbInterval_ns"],
+            f"pdbInterval_ns = {options['pdbInterval_ns']}",
             "pdbInterval = int(steps * (pdbInterval_ns / sim_length))",
         ]
     )
-    if session["restart_checkpoint"] == "yes":
-        script.append("restart_step = %s" % session["restart_step"])
-    script.append("equilibration_length = %s" % session["equilibration_length"])
+    if options["restart_checkpoint"] == "yes":
+        script.append(f"restart_step = {options['restart_step']}")
+    script.append(f"equilibration_length = {options['equilibration_length']}")
     script.append("equilibrationSteps = int(equilibration_length / step_time * 1000)")
-    script.append("platform = Platform.getPlatformByName('%s')" % session["platform"])
-    if session["platform"] in ("CUDA", "OpenCL"):
-        script.append("platformProperties = {'Precision': '%s'}" % session["precision"])
-    if session["writeDCD"]:
-        if session["restart_checkpoint"] == "yes":
+    script.append(f"platform = Platform.getPlatformByName('{options['platform']}')")
+    if options["platform"] in ("CUDA", "OpenCL"):
+        script.append("platformProperties = {'Precision': '%s'}" % options["precision"])
+    if options["writeDCD"]:
+        if options["restart_checkpoint"] == "yes":
             script.append(
-                "dcdReporter = DCDReporter('%s_%s', dcdInterval)"
-                % (session["restart_step"], session["dcdFilename"])
+                f"dcdReporter = DCDReporter('{options['restart_step']}_{options['dcdFilename']}', dcdInterval)"
             )
         else:
             script.append(
-                "dcdReporter = DCDReporter('%s', dcdInterval)"
-                % (session["dcdFilename"])
+                f"dcdReporter = DCDReporter('{options['dcdFilename']}', dcdInterval)"
             )
-    if session["writeData"]:
-        args = ", ".join("%s=True" % field for field in session["dataFields"])
-        if session["restart_checkpoint"] == "yes":
+    if options["writeData"]:
+        args = ", ".join(f"{field}=True" for field in options["dataFields"])
+        if options["restart_checkpoint"] == "yes":
             script.append(
-                "dataReporter = StateDataReporter('%s_%s', %s, totalSteps=steps,"
-                % (
-                    session["restart_step"],
-                    session["dataFilename"],
-                    session["dataInterval"],
-                )
+                f"dataReporter = StateDataReporter('{options['restart_step']}_{options['dataFilename']}', {options['dataInterval']}, totalSteps=steps,"
             )
         else:
             script.append(
-                "dataReporter = StateDataReporter('%s', %s, totalSteps=steps,"
-                % (session["dataFilename"], session["dataInterval"])
+                f"dataReporter = StateDataReporter('{options['dataFilename']}', {options['dataInterval']}, totalSteps=steps,"
             )
-        script.append("    %s, separator='\\t')" % args)
+        script.append(f"    {args}, separator='\\t')")
         if isInternal:
             # Create a second reporting sending to stdout so we can display it in the browser.
             script.append(
-                "consoleReporter = StateDataReporter(sys.stdout, %s, totalSteps=steps, %s, separator='\\t')"
-                % (session["dataInterval"], args)
+                f"consoleReporter = StateDataReporter(sys.stdout, {options['dataInterval']}, totalSteps=steps, {args}, separator='\\t')"
             )
-    if session["writeCheckpoint"]:
+    if options["writeCheckpoint"]:
         script.append(
-            "checkpointInterval = int(1000 * %s / %s)"
-            % (session["checkpointInterval_ns"], session["dt"])
+            f"checkpointInterval = int(1000 * {options['checkpointInterval_ns']} / {options['dt']})"
         )
-        if session["restart_checkpoint"] == "yes":
+        if options["restart_checkpoint"] == "yes":
             script.append(
-                "checkpointReporter = CheckpointReporter('%s_%s', checkpointInterval)"
-                % (session["restart_step"], session["checkpointFilename"])
+                f"checkpointReporter = CheckpointReporter('{options['restart_step']}_{options['checkpointFilename']}', checkpointInterval)"
             )
             script.append(
-                "checkpointReporter10 = CheckpointReporter('10x_%s__%s', checkpointInterval *10)"
-                % (session["restart_step"], session["checkpointFilename"])
+                f"checkpointReporter10 = CheckpointReporter('10x_{options['restart_step']}__{options['checkpointFilename']}', checkpointInterval *10)"
             )
             script.append(
-                "checkpointReporter100 = CheckpointReporter('100x_%s_%s', checkpointInterval *100)"
-                % (session["restart_step"], session["checkpointFilename"])
+                f"checkpointReporter100 = CheckpointReporter('100x_{options['restart_step']}_{options['checkpointFilename']}', checkpointInterval *100)"
             )
         else:
             script.append(
-                "checkpointReporter = CheckpointReporter('%s', checkpointInterval)"
-                % (session["checkpointFilename"])
+                f"checkpointReporter = CheckpointReporter('{options['checkpointFilename']}', checkpointInterval)"
             )
             script.append(
-                "checkpointReporter10 = CheckpointReporter('10x_%s', checkpointInterval* 10)"
-                % (session["checkpointFilename"])
+                f"checkpointReporter10 = CheckpointReporter('10x_{options['checkpointFilename']}', checkpointInterval* 10)"
             )
             script.append(
-                "checkpointReporter100 = CheckpointReporter('100x_%s', checkpointInterval* 100)"
-                % (session["checkpointFilename"])
+                f"checkpointReporter100 = CheckpointReporter('100x_{options['checkpointFilename']}', checkpointInterval* 100)"
             )
 
     # Prepare the simulation
 
     if fileType == "pdb":
-        if session["sdfFile"] != "":
+        if options["sdfFile"] != "":
             script.append(
                 """
 print("Preparing MD Simulation with ligand")
@@ -1441,7 +1437,7 @@ forcefield = generate_forcefield(protein_ff=forcefield_selected, solvent_ff=wate
 complex_topology, complex_positions = merge_protein_and_ligand(protein_pdb, omm_ligand)
 print("Complex topology has", complex_topology.getNumAtoms(), "atoms.")     """
             )
-        elif session["sdfFile"] == "":
+        elif options["sdfFile"] == "":
             script.append(
                 """
 protein_pdb = PDBFile(protein)     
@@ -1456,7 +1452,7 @@ else:
 if add_membrane == True:
         transitional_forcefield = generate_transitional_forcefield(protein_ff=forcefield_selected, solvent_ff=water_selected, add_membrane=add_membrane, rdkit_mol=None)     """
             )
-        if session["sdfFile"] == "":
+        if options["sdfFile"] == "":
             script.append(
                 """
 forcefield = generate_forcefield(protein_ff=forcefield_selected, solvent_ff=water_selected, add_membrane=add_membrane, rdkit_mol=None)        
@@ -1474,7 +1470,7 @@ if add_membrane == True:
 topology = modeller.topology
 positions = modeller.positions """
             )
-        elif session["sdfFile"] != "":
+        elif options["sdfFile"] != "":
             script.append(
                 """
 modeller = app.Modeller(complex_topology, complex_positions)
@@ -1497,46 +1493,26 @@ positions = modeller.positions  """
 
     script.append("\n# Prepare the Simulation\n")
     script.append("print('Building system...')")
-    hmrOptions = ", hydrogenMass=hydrogenMass" if session["hmr"] else ""
+    cutoffOptions = (
+        " nonbondedCutoff=nonbondedCutoff," if nonbondedMethod != "NoCutoff" else ""
+    )
+    ewaldOptions = (
+        ", ewaldErrorTolerance=ewaldErrorTolerance" if nonbondedMethod == "PME" else ""
+    )
+    hmrOptions = ", hydrogenMass=hydrogenMass" if hmr else ""
     if fileType == "pdb":
         script.append(
-            "system = forcefield.createSystem(topology, nonbondedMethod=nonbondedMethod,%s"
-            % (
-                " nonbondedCutoff=nonbondedCutoff,"
-                if nonbondedMethod != "NoCutoff"
-                else ""
-            )
+            f"system = forcefield.createSystem(topology, nonbondedMethod=nonbondedMethod,{cutoffOptions}"
         )
         script.append(
-            "    constraints=constraints, rigidWater=rigidWater%s%s)"
-            % (
-                (
-                    ", ewaldErrorTolerance=ewaldErrorTolerance"
-                    if nonbondedMethod == "PME"
-                    else ""
-                ),
-                hmrOptions,
-            )
+            f"    constraints=constraints, rigidWater=rigidWater{ewaldOptions}{hmrOptions})"
         )
     elif fileType == "amber":
         script.append(
-            "system = prmtop.createSystem(nonbondedMethod=nonbondedMethod,%s"
-            % (
-                " nonbondedCutoff=nonbondedCutoff,"
-                if nonbondedMethod != "NoCutoff"
-                else ""
-            )
+            f"system = prmtop.createSystem(nonbondedMethod=nonbondedMethod,{cutoffOptions}"
         )
         script.append(
-            "    constraints=constraints, rigidWater=rigidWater%s%s)"
-            % (
-                (
-                    ", ewaldErrorTolerance=ewaldErrorTolerance"
-                    if nonbondedMethod == "PME"
-                    else ""
-                ),
-                hmrOptions,
-            )
+            f"    constraints=constraints, rigidWater=rigidWater{ewaldOptions}{hmrOptions})"
         )
     if ensemble == "npt":
         script.append(
@@ -1545,9 +1521,11 @@ positions = modeller.positions  """
     script.append("integrator = LangevinMiddleIntegrator(temperature, friction, dt)")
     if constraints != "none":
         script.append("integrator.setConstraintTolerance(constraintTolerance)")
+    platformOptions = (
+        ", platformProperties" if options["platform"] in ("CUDA", "OpenCL") else ""
+    )
     script.append(
-        "simulation = app.Simulation(topology, system, integrator, platform%s)"
-        % (", platformProperties" if session["platform"] in ("CUDA", "OpenCL") else "")
+        f"simulation = app.Simulation(topology, system, integrator, platform{platformOptions})"
     )
     script.append("simulation.context.setPositions(positions)")
     if fileType == "amber":
@@ -1557,7 +1535,7 @@ positions = modeller.positions  """
         )
     # Output XML files for system and integrator
 
-    if session["writeSimulationXml"]:
+    if options["writeSimulationXml"]:
 
         def _xml_script_segment(to_serialize, target_file):
             if target_file == "":
@@ -1569,9 +1547,9 @@ positions = modeller.positions  """
             ]
 
         script.append("\n# Write XML serialized objects\n")
-        script.extend(_xml_script_segment("system", session["systemXmlFilename"]))
+        script.extend(_xml_script_segment("system", options["systemXmlFilename"]))
         script.extend(
-            _xml_script_segment("integrator", session["integratorXmlFilename"])
+            _xml_script_segment("integrator", options["integratorXmlFilename"])
         )
 
     # Minimize and equilibrate
@@ -1610,14 +1588,14 @@ with open(f'Equilibration_{prmtop_file[:-7]}.pdb', 'w') as outfile:
     PDBFile.writeFile(prmtop.topology, inpcrd.positions, outfile)
     """
         )
-    if session["restart_checkpoint"] == "yes":
-        script.append("simulation.loadCheckpoint('%s')" % session["checkpointFilename"])
+    if options["restart_checkpoint"] == "yes":
+        script.append(f"simulation.loadCheckpoint('{options['checkpointFilename']}')")
 
     # Simulate
 
     script.append("\n# Simulate\n")
     script.append("print('Simulating...')")
-    if session["restart_checkpoint"] == "yes":
+    if options["restart_checkpoint"] == "yes":
         if fileType == "pdb":
             script.append(
                 "simulation.reporters.append(PDBReporter(f'restart_output_{protein}', pdbInterval))"
@@ -1635,27 +1613,27 @@ with open(f'Equilibration_{prmtop_file[:-7]}.pdb', 'w') as outfile:
             script.append(
                 "simulation.reporters.append(PDBReporter(f'output_{prmtop_file[:-7]}.pdb', pdbInterval))"
             )
-    if session["writeDCD"]:
+    if options["writeDCD"]:
         script.append("simulation.reporters.append(dcdReporter)")
-    if session["writeData"]:
+    if options["writeData"]:
         script.append("simulation.reporters.append(dataReporter)")
         if isInternal:
             script.append("simulation.reporters.append(consoleReporter)")
-    if session["writeCheckpoint"]:
+    if options["writeCheckpoint"]:
         script.append("simulation.reporters.append(checkpointReporter)")
         script.append("simulation.reporters.append(checkpointReporter10)")
         script.append("simulation.reporters.append(checkpointReporter100)")
     script.append(
         "simulation.reporters.append(StateDataReporter(sys.stdout, 1000, step=True, potentialEnergy=True, temperature=True))"
     )
-    if session["restart_checkpoint"] == "yes":
-        script.append("simulation.currentStep = %s" % session["restart_step"])
+    if options["restart_checkpoint"] == "yes":
+        script.append(f"simulation.currentStep = {options['restart_step']}")
     else:
         script.append("simulation.currentStep = 0")
     script.append("simulation.step(steps)")
 
     # Output final simulation state
-    if session["writeFinalState"]:
+    if options["writeFinalState"]:
         script.append("\n# Write file with final simulation state\n")
         state_script = {
             "checkpoint": ['simulation.saveCheckpoint("{filename}")'],
@@ -1665,99 +1643,71 @@ with open(f'Equilibration_{prmtop_file[:-7]}.pdb', 'w') as outfile:
                 'with open("{filename}", mode="w") as file:',
                 "    PDBxFile.writeFile(simulation.topology, state.getPositions(), file)",
             ],
-        }[session["finalStateFileType"]]
+        }[options["finalStateFileType"]]
         lines = [
-            line.format(filename=session["finalStateFilename"]) for line in state_script
+            line.format(filename=options["finalStateFilename"]) for line in state_script
         ]
         script.extend(lines)
 
     # session[md_postprocessing]
-    if session["md_postprocessing"] == "True":
+    if options["md_postprocessing"] == "True":
         # mdtraj_conversion() and MDanalysis_conversion()
         if fileType == "pdb":
             script.append(
                 "mdtraj_conversion(f'Equilibration_{protein}', '%s')"
-                % session["mdtraj_output"]
+                % options["mdtraj_output"]
             )
-            if session["sdfFile"]:
-                if session["mdtraj_output"] != "mdtraj_gro_xtc":
+            if options["sdfFile"]:
+                if options["mdtraj_output"] != "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='%s', output_selection='%s', ligand_name='UNK')"
-                        % (session["mda_output"], session["mda_selection"])
+                        f"MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}', ligand_name='UNK')"
                     )
-                elif session["mdtraj_output"] == "mdtraj_gro_xtc":
+                elif options["mdtraj_output"] == "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='%s', output_selection='%s', ligand_name='UNK')"
-                        % (session["mda_output"], session["mda_selection"])
+                        f"MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}', ligand_name='UNK')"
                     )
-            elif session["sdfFile"] == "":
-                if session["mdtraj_output"] != "mdtraj_gro_xtc":
+            elif options["sdfFile"] == "":
+                if options["mdtraj_output"] != "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='%s', output_selection='%s')"
-                        % (session["mda_output"], session["mda_selection"])
+                        f"MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}')"
                     )
-                elif session["mdtraj_output"] == "mdtraj_gro_xtc":
+                elif options["mdtraj_output"] == "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='%s', output_selection='%s')"
-                        % (session["mda_output"], session["mda_selection"])
+                        f"MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}')"
                     )
         elif fileType == "amber":
             script.append(
-                "mdtraj_conversion(prmtop_file, '%s')" % session["mdtraj_output"]
+                f"mdtraj_conversion(prmtop_file, '{options['mdtraj_output']}')"
             )
-            if session["nmLig"] == False and session["spLig"] == False:
-                if session["mdtraj_output"] != "mdtraj_gro_xtc":
+            if options["nmLig"] == False and options["spLig"] == False:
+                if options["mdtraj_output"] != "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='%s', output_selection='%s')"
-                        % (session["mda_output"], session["mda_selection"])
+                        f"MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}')"
                     )
-                elif session["mdtraj_output"] == "mdtraj_gro_xtc":
+                elif options["mdtraj_output"] == "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='%s', output_selection='%s')"
-                        % (session["mda_output"], session["mda_selection"])
+                        f"MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}')"
                     )
-            elif session["nmLig"] and session["spLig"] == False:
-                if session["mdtraj_output"] != "mdtraj_gro_xtc":
+            elif options["nmLig"] and options["spLig"] == False:
+                if options["mdtraj_output"] != "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='%s', output_selection='%s', ligand_name=%s)"
-                        % (
-                            session["mda_output"],
-                            session["mda_selection"],
-                            f"'{nmLigName}'",
-                        )
+                        f"MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}', ligand_name='{nmLigName}')"
                     )
-                elif session["mdtraj_output"] == "mdtraj_gro_xtc":
+                elif options["mdtraj_output"] == "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='%s', output_selection='%s', ligand_name=%s)"
-                        % (
-                            session["mda_output"],
-                            session["mda_selection"],
-                            f"'{nmLigName}'",
-                        )
+                        f"MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}', ligand_name='{nmLigName}')"
                     )
-            elif session["nmLig"] and session["spLig"]:
-                if session["mdtraj_output"] != "mdtraj_gro_xtc":
+            elif options["nmLig"] and options["spLig"]:
+                if options["mdtraj_output"] != "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='%s', output_selection='%s', ligand_name=%s, special_ligname=%s)"
-                        % (
-                            session["mda_output"],
-                            session["mda_selection"],
-                            f"'{nmLigName}'",
-                            f"'{spLigName}'",
-                        )
+                        f"MDanalysis_conversion('centered_old_coordinates_top.pdb', 'centered_old_coordinates.dcd', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}', ligand_name='{nmLigName}', special_ligname='{spLigName}')"
                     )
-                elif session["mdtraj_output"] == "mdtraj_gro_xtc":
+                elif options["mdtraj_output"] == "mdtraj_gro_xtc":
                     script.append(
-                        "MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='%s', output_selection='%s', ligand_name=%s, special_ligname=%s)"
-                        % (
-                            session["mda_output"],
-                            session["mda_selection"],
-                            f"'{nmLigName}'",
-                            f"'{spLigName}'",
-                        )
+                        f"MDanalysis_conversion('centered_old_coordinates_top.gro', 'centered_old_coordinates.xtc', mda_output='{options['mda_output']}', output_selection='{options['mda_selection']}', ligand_name='{nmLigName}', special_ligname='{spLigName}')"
                     )
         # cleanup()
-        if session["mdtraj_removal"] == "True":
+        if options["mdtraj_removal"] == "True":
             if fileType == "pdb":
                 script.append("cleanup(f'{protein}')")
             elif fileType == "amber":
@@ -1765,352 +1715,136 @@ with open(f'Equilibration_{prmtop_file[:-7]}.pdb', 'w') as outfile:
 
     # post_md_file_movement()
     if fileType == "pdb":
-        if session["sdfFile"]:
+        if options["sdfFile"]:
             script.append("post_md_file_movement(protein,ligands=[ligand])")
-        elif session["sdfFile"] == "":
+        elif options["sdfFile"] == "":
             script.append("post_md_file_movement(protein)")
     elif fileType == "amber":
         if (
-            session["has_files"] == "yes"
+            options["has_files"] == "yes"
         ):  # In this case, no ligand file will be uploaded, thus not neccessary to assign value to argument `ligands`
             script.append(
                 "post_md_file_movement(protein_name=f'{prmtop_file[:-7]}.pdb', prmtop=prmtop_file, inpcrd=inpcrd_file)"
             )
-        elif session["has_files"] == "no":
-            if session["nmLig"] == False and session["spLig"] == False:
+        elif options["has_files"] == "no":
+            if options["nmLig"] == False and options["spLig"] == False:
                 script.append(
                     "post_md_file_movement(protein_name=f'{prmtop_file[:-7]}.pdb', prmtop=prmtop_file, inpcrd=inpcrd_file)"
                 )
-            elif session["nmLig"] and session["spLig"] == False:
+            elif options["nmLig"] and options["spLig"] == False:
                 script.append(
                     "post_md_file_movement(protein_name=f'{prmtop_file[:-7]}.pdb', prmtop=prmtop_file, inpcrd=inpcrd_file, ligands=['%s'])"
                     % nmLigFileName
                 )
-            elif session["nmLig"] and session["spLig"]:
+            elif options["nmLig"] and options["spLig"]:
                 script.append(
                     "post_md_file_movement(protein_name=f'{prmtop_file[:-7]}.pdb', prmtop=prmtop_file, inpcrd=inpcrd_file, ligands=['%s', '%s'])"
                     % (nmLigFileName, spLigFileName)
                 )
 
     # session[openmmdl_analysis]
-    if session["openmmdl_analysis"] == "Yes":
-        if session["mdtraj_output"] != "mdtraj_gro_xtc":
+    if options["openmmdl_analysis"] == "Yes":
+        if options["mdtraj_output"] != "mdtraj_gro_xtc":
             top_ext = ".pdb"
             traj_ext = ".dcd"
-        elif session["mdtraj_output"] == "mdtraj_gro_xtc":
+        elif options["mdtraj_output"] == "mdtraj_gro_xtc":
             top_ext = ".gro"
             traj_ext = ".xtc"
         # session[analysis_selection] == 'analysis_all'
-        if session["analysis_selection"] == "analysis_all":
+        if options["analysis_selection"] == "analysis_all":
             script.append("os.chdir('Final_Output/All_Atoms')")
             if fileType == "pdb":
-                if session["sdfFile"]:
+                if options["sdfFile"]:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -l %s -n UNK -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["sdfFile"],
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -l {options['sdfFile']} -n UNK -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["sdfFile"] == "":
+                elif options["sdfFile"] == "":
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
             elif fileType == "amber":
-                if session["nmLig"] == False and session["spLig"] == False:
+                if options["nmLig"] == False and options["spLig"] == False:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["nmLig"] and session["spLig"] == False:
+                elif options["nmLig"] and options["spLig"] == False:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -n %s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            nmLigName,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -n {nmLigName} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["nmLig"] and session["spLig"]:
+                elif options["nmLig"] and options["spLig"]:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -n %s -s %s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            nmLigName,
-                            spLigName,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -n {nmLigName} -s {spLigName} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
         # session[analysis_selection] == 'analysis_prot'
-        elif session["analysis_selection"] == "analysis_prot_lig":
+        elif options["analysis_selection"] == "analysis_prot_lig":
             script.append("os.chdir('Final_Output/Prot_Lig')")
             if fileType == "pdb":
-                if session["sdfFile"]:
+                if options["sdfFile"]:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -l %s -n UNK -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["sdfFile"],
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -l {options['sdfFile']} -n UNK -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["sdfFile"] == "":
+                elif options["sdfFile"] == "":
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
             elif fileType == "amber":
-                if session["nmLig"] == False and session["spLig"] == False:
+                if options["nmLig"] == False and options["spLig"] == False:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["nmLig"] and session["spLig"] == False:
+                elif options["nmLig"] and options["spLig"] == False:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -n %s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            nmLigName,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -n {nmLigName} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["nmLig"] and session["spLig"]:
+                elif options["nmLig"] and options["spLig"]:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -n %s -s %s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            nmLigName,
-                            spLigName,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -n {nmLigName} -s {spLigName} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
         # session[analysis_selection] == 'analysis_all_prot'
-        elif session["analysis_selection"] == "analysis_all_prot_lig":
+        elif options["analysis_selection"] == "analysis_all_prot_lig":
             if fileType == "pdb":
                 script.append("os.chdir('Final_Output/All_Atoms')")
-                if session["sdfFile"]:
+                if options["sdfFile"]:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -l %s -n UNK -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["sdfFile"],
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -l {options['sdfFile']} -n UNK -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
                     script.append("os.chdir('../Prot_Lig')")
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -l %s -n UNK -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["sdfFile"],
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -l {options['sdfFile']} -n UNK -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["sdfFile"] == "":
+                elif options["sdfFile"] == "":
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
                     script.append("os.chdir('../Prot_Lig')")
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
             elif fileType == "amber":
                 script.append("os.chdir('Final_Output/All_Atoms')")
-                if session["nmLig"] == False and session["spLig"] == False:
+                if options["nmLig"] == False and options["spLig"] == False:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
                     script.append("os.chdir('../Prot_Lig')")
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["nmLig"] and session["spLig"] == False:
+                elif options["nmLig"] and options["spLig"] == False:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -n %s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            nmLigName,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -n {nmLigName} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
                     script.append("os.chdir('../Prot_Lig')")
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -n %s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            nmLigName,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -n {nmLigName} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
-                elif session["nmLig"] and session["spLig"]:
+                elif options["nmLig"] and options["spLig"]:
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t centered_top%s -d centered_traj%s -n %s -s %s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            nmLigName,
-                            spLigName,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t centered_top{top_ext} -d centered_traj{traj_ext} -n {nmLigName} -s {spLigName} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
                     script.append("os.chdir('../Prot_Lig')")
                     script.append(
-                        "analysis_run_command = 'openmmdl_analysis -t prot_lig_top%s -d prot_lig_traj%s -n %s -s %s -b %s -m %s -r %s -p %s -w %s --watereps %s' "
-                        % (
-                            top_ext,
-                            traj_ext,
-                            nmLigName,
-                            spLigName,
-                            session["binding_mode"],
-                            session["min_transition"],
-                            session["rmsd_diff"],
-                            session["pml_generation"],
-                            session["stable_water"],
-                            session["wc_distance"],
-                        )
+                        f"analysis_run_command = 'openmmdl_analysis -t prot_lig_top{top_ext} -d prot_lig_traj{traj_ext} -n {nmLigName} -s {spLigName} -b {options['binding_mode']} -m {options['min_transition']} -r {options['rmsd_diff']} -p {options['pml_generation']} -w {options['stable_water']} --watereps {options['wc_distance']}' "
                     )
 
     return "\n".join(script)
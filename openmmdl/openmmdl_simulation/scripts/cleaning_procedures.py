@@ -1,7 +1,17 @@
 import os
 import shutil
+from multiprocessing.pool import ThreadPool
 from typing import List
 
+# Prefixes of the protein files written before the MD and during minimization and equilibration
+PRE_MD_FILE_PREFIXES = (
+    "prepared_no_solvent_",
+    "solvent_padding_",
+    "solvent_absolute_",
+    "membrane_",
+)
+TOPOLOGY_FILE_PREFIXES = ("Energyminimization_", "Equilibration_")
+
 
 def cleanup(protein_name):
     """Cleans up the PDB Reporter Output File and MDTraj Files of the performed simulation.
@@ -23,7 +33,7 @@ def cleanup(protein_name):
 
 
 def create_directory_if_not_exists(directory_path):
-    """Create a directory if it doesn't exist, or overwrite it if already does.
+    """Create a directory if it doesn't exist. An existing directory and its content are kept.
 
     Args:
         directory_path (str): Path of the directory that you want to create.
@@ -31,15 +41,12 @@ def create_directory_if_not_exists(directory_path):
     Returns:
         None
     """
-    if not os.path.exists(directory_path):
-        os.mkdir(directory_path)
-    else:
-        shutil.rmtree(directory_path)
-        os.mkdir(directory_path)
+    os.makedirs(directory_path, exist_ok=True)
 
 
 def copy_file(src, dest):
-    """Copy a file to the destination path.
+    """Copy a file to the destination path. The copy is a hard link where the file system allows it, so no data is duplicated.
+    A hard-linked copy shares its data with the original, writing to one of the files in place also changes the other.
 
     Args:
         src (str): Path of the file that needs to be copied.
@@ -49,22 +56,44 @@ def copy_file(src, dest):
         None
     """
     if os.path.exists(src):
-        shutil.copy(src, dest)
-
-
-def organize_files(source, destination):
+        if os.path.isdir(dest):
+            target = os.path.join(dest, os.path.basename(src))
+        else:
+            target = dest
+        try:
+            if os.path.lexists(target):
+                # Nothing to do if the target is the source itself or already a hard link to it
+                if os.path.samefile(src, target):
+                    return
+                # Replace an earlier copy, like shutil.copy would overwrite it
+                os.remove(target)
+            os.link(src, target)
+        except OSError:
+            # Hard links fail across devices or on file systems without link support
+            shutil.copy(src, dest)
+
+
+def organize_files(source, destination, existing=None):
     """Organizes the files and moves them from the source to the destination directory.
 
     Args:
-        source (str): Path of the file that needs to be moved.
+        source (Iterable[str]): Paths of the files that need to be moved.
         destination (str): Path of destination where the file needs to be moved to.
+        existing (set, optional): Names of the files present in the working directory. If given, it is used instead of checking every file on disk.
 
     Returns:
         None
     """
     for file in source:
-        if os.path.exists(file):
-            os.rename(file, os.path.join(destination, os.path.basename(file)))
+        exists = file in existing if existing is not None else os.path.exists(file)
+        if exists:
+            target = os.path.join(destination, os.path.basename(file))
+            try:
+                # os.replace also overwrites an existing target on Windows
+                os.replace(file, target)
+            except OSError:
+                # Moves across file systems fall back to a copy followed by deletion
+                shutil.move(file, target)
 
 
 def post_md_file_movement(
@@ -95,73 +124,77 @@ def post_md_file_movement(
     # Move input files
     if ligands:
         for lig in ligands:
-            copy_file(lig, "Input_Files")
-            copy_file(lig, "Final_Output/All_Atoms")
-            copy_file(lig, "Final_Output/Prot_Lig")
-
-    copy_file(protein_name, "Input_Files")
-    copy_file(prmtop, "Input_Files") if prmtop else None
-    copy_file(inpcrd, "Input_Files") if inpcrd else None
-
-    # Organize pre-MD files
-    source_pre_md_files = [
-        "prepared_no_solvent_",
-        "solvent_padding_",
-        "solvent_absolute_",
-        "membrane_",
+            if not os.path.exists(lig):
+                continue
+            # Input_Files keeps real copies as a backup, which in-place writes to the outputs cannot change
+            shutil.copy(lig, "Input_Files")
+            shutil.copy(lig, "Final_Output/All_Atoms")
+            # Only the output copies share their data, the Prot_Lig copy is linked to the All_Atoms copy
+            output_copy = os.path.join("Final_Output/All_Atoms", os.path.basename(lig))
+            copy_file(output_copy, "Final_Output/Prot_Lig")
+
+    for input_file in (protein_name, prmtop, inpcrd):
+        if input_file and os.path.exists(input_file):
+            shutil.copy(input_file, "Input_Files")
+
+    # List the working directory once instead of checking every file on disk
+    existing = {entry.name for entry in os.scandir(".") if entry.is_file()}
+
+    file_groups = [
+        # Organize pre-MD files
+        (
+            (f"{prefix}{protein_name}" for prefix in PRE_MD_FILE_PREFIXES),
+            "MD_Files/Pre_MD",
+        ),
+        # Organize topology files after minimization and equilibration
+        (
+            (f"{prefix}{protein_name}" for prefix in TOPOLOGY_FILE_PREFIXES),
+            "MD_Files/Minimization_Equilibration",
+        ),
+        # Organize simulation output files
+        ([f"output_{protein_name}", "trajectory.dcd"], "MD_Files/MD_Output"),
+        # Organize MDtraj and MDAnalysis files
+        (
+            [
+                "centered_old_coordinates_top.pdb",
+                "centered_old_coordinates.dcd",
+                "centered_old_coordinates_top.gro",
+                "centered_old_coordinates.xtc",
+                "centered_traj_unaligned.dcd",
+                "centered_traj_unaligned.xtc",
+                "prot_lig_traj_unaligned.dcd",
+                "prot_lig_traj_unaligned.xtc",
+            ],
+            "MD_Postprocessing",
+        ),
+        (
+            [
+                "centered_top.pdb",
+                "centered_traj.dcd",
+                "centered_top.gro",
+                "centered_traj.xtc",
+            ],
+            "Final_Output/All_Atoms",
+        ),
+        (
+            [
+                "prot_lig_top.pdb",
+                "prot_lig_traj.dcd",
+                "prot_lig_top.gro",
+                "prot_lig_traj.xtc",
+            ],
+            "Final_Output/Prot_Lig",
+        ),
+        # Organize checkpoint files
+        (
+            ["checkpoint.chk", "10x_checkpoint.chk", "100x_checkpoint.chk"],
+            "Checkpoints",
+        ),
     ]
-    destination_pre_md = "MD_Files/Pre_MD"
-    organize_files(
-        [f"{prefix}{protein_name}" for prefix in source_pre_md_files],
-        destination_pre_md,
-    )
-
-    # Organize topology files after minimization and equilibration
-    source_topology_files = ["Energyminimization_", "Equilibration_"]
-    destination_topology = "MD_Files/Minimization_Equilibration"
-    organize_files(
-        [f"{prefix}{protein_name}" for prefix in source_topology_files],
-        destination_topology,
-    )
-
-    # Organize simulation output files
-    organize_files([f"output_{protein_name}", "trajectory.dcd"], "MD_Files/MD_Output")
-
-    # Organize MDtraj and MDAnalysis files
-    organize_files(
-        [
-            "centered_old_coordinates_top.pdb",
-            "centered_old_coordinates.dcd",
-            "centered_old_coordinates_top.gro",
-            "centered_old_coordinates.xtc",
-            "centered_traj_unaligned.dcd",
-            "centered_traj_unaligned.xtc",
-            "prot_lig_traj_unaligned.dcd",
-            "prot_lig_traj_unaligned.xtc",
-        ],
-        "MD_Postprocessing",
-    )
-    organize_files(
-        [
-            "centered_top.pdb",
-            "centered_traj.dcd",
-            "centered_top.gro",
-            "centered_traj.xtc",
-        ],
-        "Final_Output/All_Atoms",
-    )
-    organize_files(
-        [
-            "prot_lig_top.pdb",
-            "prot_lig_traj.dcd",
-            "prot_lig_top.gro",
-            "prot_lig_traj.xtc",
-        ],
-        "Final_Output/Prot_Lig",
-    )
-
-    # Organize checkpoint files
-    organize_files(
-        ["checkpoint.chk", "10x_checkpoint.chk", "100x_checkpoint.chk"],
-        "Checkpoints",
-    )
+
+    # The groups move disjoint files into different directories, so the blocking renames can overlap in threads
+    with ThreadPool(processes=len(file_groups)) as pool:
+        pool.starmap(
+            organize_files,
+            [(source, destination, existing) for source, destination in file_groups],
+        )
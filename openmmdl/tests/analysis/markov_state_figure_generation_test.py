@@ -1,7 +1,11 @@
 import networkx as nx
 import os
+import pytest
+from multiprocessing.pool import ThreadPool
+from unittest.mock import patch
 from openmmdl.openmmdl_analysis.markov_state_figure_generation import (
     min_transition_calculation,
+    markov_chain_plot,
     binding_site_markov_network,
 )
 
@@ -14,6 +18,30 @@ def test_min_transition_calculation():
     assert result == expected_output
 
 
+# Create a test for markov_chain_plot
+def test_markov_chain_plot():
+    transition_pairs = [("A", "B", 20.0, 10.0)]
+    self_loop_occurences = {"A": 30.0}
+    os.makedirs("Binding_Modes_Markov_States", exist_ok=True)
+
+    markov_chain_plot(
+        15,
+        {"A": (0.0, 0.0), "B": (1.0, 1.0)},
+        transition_pairs,
+        self_loop_occurences,
+        {("A", "B"): "A to B", ("B", "A"): "B to A"},
+        node_color_map={"A": "green", "B": "skyblue"},
+        node_size_map={"A": 1000, "B": 500},
+        node_label_map={"A": "A", "B": "B"},
+        fig_type="png",
+        dpi=10,
+    )
+
+    assert os.path.exists(
+        os.path.join("Binding_Modes_Markov_States", "markov_chain_plot_15.png")
+    )
+
+
 # Create a test for binding_site_markov_network
 def test_binding_site_markov_network():
     # Define test data
@@ -32,4 +60,60 @@ def test_binding_site_markov_network():
         assert os.path.exists(plot_path)
 
 
+def test_binding_site_markov_network_transitions():
+    # 5 frames, transitions A->A, A->B, B->A and A->C, A occurs 3 times, B and C once
+    combined_dict = {"all": ["A", "A", "B", "A", "C"]}
+
+    # A single process plots in a plain loop without creating a Pool
+    with patch(
+        "openmmdl.openmmdl_analysis.markov_state_figure_generation.markov_chain_plot"
+    ) as mock_plot, patch(
+        "openmmdl.openmmdl_analysis.markov_state_figure_generation.Pool"
+    ) as mock_pool:
+        binding_site_markov_network(5, [5], combined_dict, "png")
+
+    mock_pool.assert_not_called()
+    mock_plot.assert_called_once()
+    kwargs = mock_plot.call_args.kwargs
+
+    # Every transition occurs in 1 of 5 frames (20%), C never transitions back to A
+    assert [tuple(pair) for pair in kwargs["transition_pairs"]] == [
+        ("A", "B", pytest.approx(20.0), pytest.approx(20.0)),
+        ("A", "C", pytest.approx(20.0), pytest.approx(0.0)),
+    ]
+    assert kwargs["self_loop_occurences"] == {"A": pytest.approx(20.0)}
+
+    # Leaving A has a 1/3 probability per transition, leaving B a 100% probability
+    assert kwargs["edge_labels"] == {
+        ("A", "B"): "20.00% of Frames →, 100.00% probability\n20.00% of Frames ←, 33.33% probability",
+        ("B", "A"): "20.00% of Frames →, 33.33% probability\n20.00% of Frames ←, 100.00% probability",
+        ("A", "C"): "0.00% of Frames →, 0.00% probability\n0.00% of Frames ←, 0.00% probability",
+        ("C", "A"): "20.00% of Frames →, 33.33% probability\n0.00% of Frames ←, 0.00% probability",
+    }
+    assert kwargs["node_size_map"] == {"A": 600, "B": 200, "C": 200}
+
+
+def test_binding_site_markov_network_processes():
+    combined_dict = {"all": ["A", "A", "B", "A", "C"]}
+
+    # Run the plots in threads so the patched plotting function records its arguments
+    with patch(
+        "openmmdl.openmmdl_analysis.markov_state_figure_generation.markov_chain_plot"
+    ) as mock_plot, patch(
+        "openmmdl.openmmdl_analysis.markov_state_figure_generation.Pool",
+        wraps=ThreadPool,
+    ) as mock_pool:
+        binding_site_markov_network(
+            5, [5, 10, 20], combined_dict, "png", num_processes=2
+        )
+
+    mock_pool.assert_called_once_with(processes=2)
+    assert sorted(call.args[0] for call in mock_plot.call_args_list) == [5, 10, 20]
+
+
+def test_binding_site_markov_network_empty_sequence():
+    # An empty binding mode sequence returns without plotting instead of dividing by zero
+    assert binding_site_markov_network(0, [5], {"all": []}, "png") is None
+
+
 # Optionally, you can include more test cases to cover different scenarios and edge cases.
@@ -1824,3 +1824,34 @@ def test_calculate_representative_frame():
     dm = calculate_distance_matrix(md, "protein or resname UNK")
     rep = calculate_representative_frame([i for i in range(1, 10)], dm)
     assert rep == 4
+
+
+def test_calculate_distance_matrix_matches_pairwise_rmsd():
+    test_data_directory = Path("openmmdl/tests/data/in")
+    md = mda.Universe(f"{test_data_directory}/0_unk_hoh.pdb", f"{test_data_directory}/all_50.dcd")
+    selection = "protein or resname UNK"
+    atomgroup = md.select_atoms(selection)
+    coords = np.array([atomgroup.positions.astype(np.float64) for _ in md.trajectory])
+    # direct RMSD between every pair of frames
+    expected = np.sqrt(((coords[:, None] - coords[None, :]) ** 2).sum(axis=(2, 3)) / atomgroup.n_atoms)
+
+    # a small block size splits the matrix into several diagonal and off-diagonal tiles
+    dm = calculate_distance_matrix(md, selection, block_size=7)
+
+    assert dm.shape == expected.shape
+    assert np.allclose(dm, expected, rtol=0, atol=1e-6)
+    assert np.allclose(dm, dm.T)
+
+
+def test_calculate_distance_matrix_gpu_fallback(monkeypatch, capsys):
+    test_data_directory = Path("openmmdl/tests/data/in")
+    md = mda.Universe(f"{test_data_directory}/0_unk_hoh.pdb", f"{test_data_directory}/all_50.dcd")
+    selection = "protein or resname UNK"
+
+    # Without CuPy the GPU option falls back to the CPU calculation
+    monkeypatch.setattr("openmmdl.openmmdl_analysis.binding_mode_processing.cp", None)
+    dm_gpu = calculate_distance_matrix(md, selection, use_gpu=True)
+    dm_cpu = calculate_distance_matrix(md, selection)
+
+    assert "CuPy is not installed" in capsys.readouterr().out
+    assert np.array_equal(dm_gpu, dm_cpu)
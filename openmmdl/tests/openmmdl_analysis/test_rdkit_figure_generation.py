@@ -126,7 +126,6 @@ def test_create_and_merge_images_with_split_data():
 
     # Define source image paths
     source_image_path = "openmmdl/tests/data/openmmdl_analysis/rdkit_figure_generation/Binding_Mode_1.png"
-    source_svg_path = "openmmdl/tests/data/openmmdl_analysis/rdkit_figure_generation/Binding_Mode_1.svg"
     source_merged_image_path = "openmmdl/tests/data/openmmdl_analysis/rdkit_figure_generation/Binding_Mode_1_merged.png"
 
     # Copy source image files to the working directory
@@ -134,14 +133,10 @@ def test_create_and_merge_images_with_split_data():
     destination_image_path = os.path.join(
         working_directory, os.path.basename(source_image_path)
     )
-    destination_svg_path = os.path.join(
-        working_directory, os.path.basename(source_svg_path)
-    )
     destination_merged_image_path = os.path.join(
         working_directory, os.path.basename(source_merged_image_path)
     )
     shutil.copy(source_image_path, destination_image_path)
-    shutil.copy(source_svg_path, destination_svg_path)
     shutil.copy(source_merged_image_path, destination_merged_image_path)
 
     # Print the current files in the working directory for debugging
@@ -169,6 +164,43 @@ def test_create_and_merge_images_with_split_data():
         pytest.fail(f"Merged image file is not a valid image: {e}")
 
 
+def test_create_and_merge_images_unknown_interaction():
+    # An interaction without a legend color is drawn in the first color of the matplotlib color cycle
+    binding_mode = "Binding_Mode_Unknown"
+    Image.new("RGB", (600, 600), "white").save(f"{binding_mode}.png")
+
+    merged_image_paths = create_and_merge_images(
+        binding_mode, 50, ["100ALAA 4210 unknown"], []
+    )
+
+    with Image.open(merged_image_paths[0]) as img:
+        legend_colors = {color for _, color in img.convert("RGB").getcolors(2**24)}
+    assert (31, 119, 180) in legend_colors
+    assert not os.path.exists(f"{binding_mode}.png")
+
+
+def test_generate_binding_mode_image():
+    # Prepare the ligand with bond orders and 2D coordinates
+    lig_rd = Chem.MolFromPDBFile(str(lig_no_h))
+    with open(smi_file, "r") as file:
+        reference_mol = Chem.MolFromSmiles(file.read().strip())
+    prepared_ligand = AllChem.AssignBondOrdersFromTemplate(reference_mol, lig_rd)
+    AllChem.Compute2DCoords(prepared_ligand)
+
+    values = {
+        "163GLYA_4202_Acceptor_hbond",
+        "161PHEA_4211_4212_4213_4214_4215_4210_hydrophobic",
+    }
+    merged_image_path = generate_binding_mode_image(
+        "Binding_Mode_3", values, 42.0, prepared_ligand, lig_index=1
+    )
+
+    assert merged_image_path == "Binding_Mode_3_merged.png"
+    with Image.open(merged_image_path) as img:
+        img.verify()
+    assert not os.path.exists("Binding_Mode_3.svg")
+
+
 def test_max_width_and_height_calculation():
     # Create some example images with different sizes
     image1 = Image.new("RGB", (100, 200), (255, 255, 255))
@@ -264,7 +296,7 @@ def test_arranged_figure_generation():
     assert output_path is not None
 
 
-output_image_file = "output_image.png"
+output_image_basename = "output_image"
 
 # Copy the files to the current folder
 shutil.copy(complex, Path.cwd())
@@ -276,11 +308,17 @@ shutil.copy(smi_file, Path.cwd())
 def test_generate_ligand_image():
     ligand_name = "UNK"
     generate_ligand_image(
-        ligand_name, "complex.pdb", "lig_no_h.pdb", "lig_no_h.smi", output_image_file
+        ligand_name,
+        "complex.pdb",
+        "lig_no_h.pdb",
+        "lig_no_h.smi",
+        output_image_basename,
+        "png",
     )
 
-    # Assert that the output image file exists
-    assert os.path.exists(output_image_file)
+    # Assert that the SVG and the PNG image files exist
+    assert os.path.exists(f"{output_image_basename}.svg")
+    assert os.path.exists(f"{output_image_basename}.png")
 
 
 # Run the tests
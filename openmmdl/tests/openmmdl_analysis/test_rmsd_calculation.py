@@ -69,3 +69,22 @@ def test_rmsd_dist_frames():
     # Cleanup created files after the test
     with contextlib.suppress(FileNotFoundError):
         os.remove(plot_path)
+
+
+def test_rmsd_dist_frames_in_memory():
+
+    # Call the function with the trajectory read from disk and loaded into memory
+    pairwise_rmsd_prot, pairwise_rmsd_lig = RMSD_dist_frames(
+        topology_file, trajectory_file, fig_type, ligand_name
+    )
+    pairwise_rmsd_prot_mem, pairwise_rmsd_lig_mem = RMSD_dist_frames(
+        topology_file, trajectory_file, fig_type, ligand_name, in_memory=True
+    )
+
+    # Check if loading the trajectory into memory gives the same matrices
+    np.testing.assert_allclose(pairwise_rmsd_prot_mem, pairwise_rmsd_prot)
+    np.testing.assert_allclose(pairwise_rmsd_lig_mem, pairwise_rmsd_lig)
+
+    # Cleanup created files after the test
+    with contextlib.suppress(FileNotFoundError):
+        os.remove("./RMSD/RMSD_between_the_frames.png")
@@ -42,8 +42,11 @@ def test_create_directory_if_not_exists(test_directory_path):
     # Check if the directory exists
     assert os.path.exists(test_directory_path)
 
-    # Call the function again, it should not raise an error
+    # Call the function again, it should not raise an error or remove the content
+    with open(os.path.join(test_directory_path, "keep.txt"), "w") as dummy_file:
+        dummy_file.write("Dummy content")
     create_directory_if_not_exists(test_directory_path)
+    assert os.path.exists(os.path.join(test_directory_path, "keep.txt"))
 
     # Cleanup: Remove the test directory
     shutil.rmtree(test_directory_path)
@@ -70,10 +73,31 @@ def test_copy_file(mock_copy, mock_exists):
     mock_copy.assert_called_with(src, dest)
 
 
-# Mock the os.path.exists and os.rename functions
+def test_copy_file_into_directory(tmp_path):
+    src = tmp_path / "source_file.txt"
+    src.write_text("Dummy content")
+    dest = tmp_path / "destination_directory"
+    dest.mkdir()
+
+    # Copying twice replaces the first copy instead of failing
+    copy_file(str(src), str(dest))
+    copy_file(str(src), str(dest))
+
+    assert (dest / "source_file.txt").read_text() == "Dummy content"
+    assert src.exists()
+    # The copy is a hard link to the source
+    assert os.path.samefile(src, dest / "source_file.txt")
+    assert src.stat().st_nlink == 2
+
+    # Copying a file onto itself keeps it
+    copy_file(str(dest / "source_file.txt"), str(dest))
+    assert (dest / "source_file.txt").read_text() == "Dummy content"
+
+
+# Mock the os.path.exists and os.replace functions
 @patch("os.path.exists")
-@patch("os.rename")
-def test_organize_files(mock_rename, mock_exists):
+@patch("os.replace")
+def test_organize_files(mock_replace, mock_exists):
     source = ["file1.txt", "file2.txt", "file3.txt"]
     destination = "destination_directory"
 
@@ -83,9 +107,23 @@ def test_organize_files(mock_rename, mock_exists):
     # Call the organize_files function
     organize_files(source, destination)
 
-    # Print the calls made to os.rename
-    for call in mock_rename.call_args_list:
-        print(call)
+    # Check that every file was moved into the destination directory
+    assert mock_replace.call_count == len(source)
+    for file, call in zip(source, mock_replace.call_args_list):
+        assert call.args == (file, os.path.join(destination, file))
+
+
+def test_organize_files_with_existing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "file1.txt").write_text("first")
+    (tmp_path / "file2.txt").write_text("second")
+    (tmp_path / "destination_directory").mkdir()
+
+    # Only files listed in the existing set are moved, without checking the disk
+    organize_files(["file1.txt", "file2.txt"], "destination_directory", {"file1.txt"})
+
+    assert os.path.exists(tmp_path / "destination_directory" / "file1.txt")
+    assert os.path.exists(tmp_path / "file2.txt")
 
 
 # def test_post_md_file_movement():
@@ -181,6 +219,17 @@ def test_post_md_file_movement():
     assert os.path.exists(checkpoints_dir / "checkpoint.chk")
     assert os.path.exists(checkpoints_dir / "10x_checkpoint.chk")
 
+    # The backups in Input_Files are real copies, only the ligand output copies are linked to each other
+    assert not os.path.samefile(ligand, input_files_dir / "CVV.sdf")
+    assert not os.path.samefile(prmtop, input_files_dir / "6b73.prmtop")
+    assert not os.path.samefile(
+        input_files_dir / "CVV.sdf", final_output_dir / "All_Atoms" / "CVV.sdf"
+    )
+    assert os.path.samefile(
+        final_output_dir / "All_Atoms" / "CVV.sdf",
+        final_output_dir / "Prot_Lig" / "CVV.sdf",
+    )
+
 
 # Run the tests
 if __name__ == "__main__":